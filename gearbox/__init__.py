@@ -17,7 +17,8 @@ import warnings
 # import time
 #----------------------------------------------------------------
 
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
@@ -33,6 +34,9 @@ import numpy as np
 # import local libarys
 from gearbox.vibration import Gearbox_Vibration as Vibration
 from gearbox.degradation import Gearbox_Degradation as Degradation
+from gearbox.cache import VibrationCache, get_cache_key
+from gearbox.snapshot import save_object, load_object
+from gearbox.checkpoint import Checkpoint
 
 
 ####################################################
@@ -59,10 +63,24 @@ class Gearbox(Vibration,
                  verbose=0,
                  fixed_start=True,
                  GearDegVibDictIn=None,
-                 GearDegVibDictOut=None
+                 GearDegVibDictOut=None,
+                 gear_synthesis='matrix',
+                 vibration_cache=None,
+                 window_synthesis=True,
+                 degradation_only=False
                  ):
         """
         Parent Class Constructor
+        gear_synthesis: 'matrix' (one signal per tooth mesh, needed to
+        plot gears) or 'overlap_add' (less memory, see Gear)
+        vibration_cache: VibrationCache or cache directory, initialized
+        Vibration is loaded from (and stored to) disk (see gearbox.cache),
+        only used if a seed is given
+        window_synthesis: if fixed_start is False, synthesize only the
+        samples of the random window (see Gearbox_Vibration)
+        degradation_only: if True, run() and run_schedule() return no
+        vibration and only the tooth mesh bounds needed for the loads are
+        initialized, vibration is rendered later by render_vibration()
         """
         # Vibration Arguments
         self.ga_rotational_frequency_in = rotational_frequency_in
@@ -90,25 +108,46 @@ class Gearbox(Vibration,
         # Degradation Vibration
         self.GearDegVibDictIn = GearDegVibDictIn
         self.GearDegVibDictOut = GearDegVibDictOut
+        self.gear_synthesis = gear_synthesis
+        self.window_synthesis = window_synthesis
+        self.degradation_only = degradation_only
+        if isinstance(vibration_cache, str):
+            vibration_cache = VibrationCache(vibration_cache)
+        self.vibration_cache = vibration_cache
+        # Incremental checkpoints (see enable_checkpoints)
+        self.ga_checkpoint = None
 
 
-    def initialize(self, torque):
+    def initialize(self, torque, templates=None):
         """
         Method to initialize the model.
+        templates: SharedTemplates of an initialized Vibration (see
+        export_templates), Vibration is then attached from shared memory
+        instead of initialized. The exporting model must have the same
+        arguments (element dictionaries, seed, fixed_start, ...) and
+        torque, otherwise an AssertionError is raised.
         """
-        self.Vibration = Vibration(self.ga_rotational_frequency_in,
-                                    self.ga_sample_interval,
-                                    self.ga_sample_rate,
-                                    self.ga_GearIn,
-                                    self.ga_GearOut,
-                                    self.ga_Bearing1,
-                                    self.ga_Bearing2,
-                                    self.ga_Bearing3,
-                                    self.ga_Bearing4,
-                                    seed=self.ga_seed,
-                                    fixed_start=self.fixed_start,
-                                    GearDegVibDictIn=self.GearDegVibDictIn,
-                                    GearDegVibDictOut=self.GearDegVibDictOut)
+        # Arguments the Vibration is initialized with (see export_templates)
+        self.ga_vibration_key = self.get_vibration_cache_key(torque)
+        # Initialized Vibration from shared memory or cache (else None)
+        self.Vibration = self.get_initialized_vibration(torque, templates)
+        vibration_initialized = self.Vibration is not None
+        if not vibration_initialized:
+            self.Vibration = Vibration(self.ga_rotational_frequency_in,
+                                        self.ga_sample_interval,
+                                        self.ga_sample_rate,
+                                        self.ga_GearIn,
+                                        self.ga_GearOut,
+                                        self.ga_Bearing1,
+                                        self.ga_Bearing2,
+                                        self.ga_Bearing3,
+                                        self.ga_Bearing4,
+                                        seed=self.ga_seed,
+                                        fixed_start=self.fixed_start,
+                                        GearDegVibDictIn=self.GearDegVibDictIn,
+                                        GearDegVibDictOut=self.GearDegVibDictOut,
+                                        gear_synthesis=self.gear_synthesis,
+                                        window_synthesis=self.window_synthesis)
         # Init Gearbox Degradation
         self.Degradation = Degradation(self.ga_GearIn['no_teeth'],
                                        self.ga_GearOut['no_teeth'],
@@ -126,9 +165,15 @@ class Gearbox(Vibration,
         statei = self.Degradation.init_degradation()
         # print('### Execution Time "Degradation Init": %.3f' % (time.time() - start))
         # start = time.time()
-        if self.verbose == 1:
+        if (self.verbose == 1) and not(vibration_initialized):
             display(HTML('<div style="background-color:rgb(62, 68, 76);color:white;padding:0.5em;letter-spacing:0.1em;font-size:1.5em;align=center"><p><b>Initialize Vibration</b></p></div>'))
-        self.Vibration.init_vibration(torque)
+        if not vibration_initialized and self.degradation_only:
+            # Only tooth mesh bounds for the loads (see render_vibration)
+            self.Vibration.init_loads(torque)
+        elif not vibration_initialized:
+            self.Vibration.init_vibration(torque)
+            if self.use_vibration_cache():
+                self.vibration_cache.store(self.get_vibration_cache_key(torque), self.Vibration)
         # print('### Execution Time "Vibration Init": %.3f' % (time.time() - start))
         # start = time.time()
         # Get loads
@@ -141,10 +186,55 @@ class Gearbox(Vibration,
         self.ga_load_cycle = [np.nan]
         self.ga_loads = [loads]
         self.ga_statei = [statei]
+        # Previous checkpoints belong to the previous initialization
+        if self.ga_checkpoint is not None:
+            self.ga_checkpoint.start_chain()
         # print('### Execution Time "Save Parameters": %.3f' % (time.time() - start))
         if self.verbose == 1:
             display(HTML('<p>Done</p>'))
 
+    def get_initialized_vibration(self, torque, templates=None):
+        """
+        Method to get an initialized Vibration from given templates
+        (shared memory) or from the vibration cache. Returns None
+        if Vibration must be initialized.
+        """
+        if templates is not None:
+            # Attach initialized Vibration from shared memory
+            assert templates.key == self.get_vibration_cache_key(torque), 'Templates must be exported by a model with the same arguments (seed, torque, ...)'
+            return(templates.attach())
+        if self.use_vibration_cache():
+            # Memory mapped Vibration, None if not cached
+            return(self.vibration_cache.load(self.get_vibration_cache_key(torque)))
+        return(None)
+
+    def use_vibration_cache(self):
+        """
+        Method to check if the vibration cache is used, models
+        without seed are not cached (random degradation impulses)
+        """
+        return((self.vibration_cache is not None) and (self.ga_seed is not None))
+
+    def get_vibration_cache_key(self, torque):
+        """
+        Method to get the vibration cache key, a hash of all
+        arguments init_vibration depends on
+        """
+        return(get_cache_key(version=self.version,
+                             rotational_frequency_in=self.ga_rotational_frequency_in,
+                             sample_interval=self.ga_sample_interval,
+                             sample_rate=self.ga_sample_rate,
+                             GearIn=self.ga_GearIn, GearOut=self.ga_GearOut,
+                             Bearing1=self.ga_Bearing1, Bearing2=self.ga_Bearing2,
+                             Bearing3=self.ga_Bearing3, Bearing4=self.ga_Bearing4,
+                             GearDegVibDictIn=self.GearDegVibDictIn,
+                             GearDegVibDictOut=self.GearDegVibDictOut,
+                             seed=self.ga_seed,
+                             fixed_start=self.fixed_start,
+                             gear_synthesis=self.gear_synthesis,
+                             window_synthesis=self.window_synthesis,
+                             torque=np.asarray(torque)))
+
     def reinitialize(self, torque, seed=None):
         """
         Method to REinitialize the model, Vibration is kept as it and
@@ -183,14 +273,20 @@ class Gearbox(Vibration,
         self.ga_load_cycle = [np.nan]
         self.ga_loads = [loads]
         self.ga_statei = [statei]
+        # Previous checkpoints belong to the previous initialization
+        if self.ga_checkpoint is not None:
+            self.ga_checkpoint.start_chain()
         # print('### Execution Time "Save Parameters": %.3f' % (time.time() - start))
         if self.verbose == 1:
             display(HTML('<p>Done</p>'))
 
 
-    def run(self, nolc, output=True):
+    def run(self, nolc, output=True, out=None):
         """
         Method to initialize the model.
+        out: C-contiguous float64 array (e.g. a row of a memmap), the
+        vibration is written to out and out is returned, the model keeps
+        no reference to it (ga_vibration is None)
         """
         #if self.ga_load_cycle[-1] + self.ga_mgbm >= nolc:
         #    warnings.warn('Given Load Cycle is smaller than the endpoint of the previous measurement. Please Check, otherwise this might lead to unreasonable results.')
@@ -200,15 +296,173 @@ class Gearbox(Vibration,
         # print('### Execution Time "Degradation RUN": %.3f' % (time.time() - start))
         # start = time.time()
         # Get Vibration based on previous selected torque
-        self.ga_vibration = self.Vibration.run_vibration(nolc, self.ga_torque[-1], statei, output=True)
+        if self.degradation_only:
+            assert out is None, 'No vibration in degradation only mode, see render_vibration()'
+            vibration = None
+            # Arguments of the last run (see summary_vibration)
+            self.Vibration.last_run = (nolc, self.ga_torque[-1], statei)
+        else:
+            vibration = self.Vibration.run_vibration(nolc, self.ga_torque[-1], statei, output=True, out=out)
+        self.ga_vibration = vibration if out is None else None
         # print('### Execution Time "Vibration Run": %.3f' % (time.time() - start))
         # Append global Attributes
         self.ga_load_cycle.append(nolc)
+        # Current state (previous states see get_statei_history)
         self.ga_statei.append(statei)
+        if self.ga_checkpoint is not None:
+            self.ga_checkpoint.step()
         if self.verbose == 1:
             print('Load Cycle %i done' % (nolc), end="\r")
         if output is True:
-            return(self.ga_vibration)
+            return(vibration)
+
+    def run_schedule(self, nolcs, torques=None, out=None, workers=1, executor='thread'):
+        """
+        Method to run the model for all given nolcs at once, same
+        results as
+            for idx, nolc in enumerate(nolcs):
+                run(nolc)
+                if torques[idx] is not None:
+                    set(nolc, torques[idx])
+        Degradation is calculated vectorized (once per piecewise
+        constant torque segment), all vibration windows are rendered
+        into one array.
+        torques: None (keep current torque) or one torque (or None)
+        per nolc, set after this nolc
+        out: C-contiguous float64 array (nolcs x samples) for the vibration
+        workers: number of threads or processes (executor 'thread' or
+        'process') rendering the vibration windows after the degradation
+        of all nolcs is known (same results as workers=1)
+        Returns the vibration (nolcs x samples, None if degradation_only)
+        and the states as dict
+        {'nolc': nolcs, 'GearIn': (pitting, damage), 'GearOut': ...}
+        (nolcs x teeth arrays, None if gear has no failing teeth)
+        """
+        nolcs = np.asarray(nolcs, dtype=np.float64).reshape(-1)
+        assert nolcs.size > 0, 'At least one nolc must be given'
+        assert np.all(np.diff(nolcs) > 0), 'Given nolcs must be strictly increasing'
+        if torques is None:
+            torques = [None] * nolcs.size
+        assert len(torques) == nolcs.size, 'One torque (or None) per nolc must be given'
+        # Loads applied until each nolc (piecewise constant)
+        loads = []
+        loads_curr = self.ga_loads[-1]
+        torque_curr = self.ga_torque[-1]
+        loads_set = []
+        for torque in torques:
+            loads.append(loads_curr)
+            torque_run = torque_curr
+            if torque is not None:
+                loads_curr = self.Vibration.get_loads(torque)
+                torque_curr = torque
+                loads_set.append(loads_curr)
+        # Degradation of all nolcs
+        states = self.Degradation.run_degradation_schedule(nolcs, loads)
+        # Vibration of all nolcs
+        pittings = {key: (None if states[key] is None else states[key][0]) for key in ['GearIn', 'GearOut']}
+        if self.degradation_only:
+            assert out is None, 'No vibration in degradation only mode, see render_vibration()'
+            vibration = None
+        else:
+            vibration = self.Vibration.run_vibration_schedule(nolcs, pittings, out=out, workers=workers, executor=executor)
+        # Append global Attributes (as run and set)
+        loads_set = iter(loads_set)
+        for nolc, torque in zip(nolcs, torques):
+            self.ga_load_cycle.append(nolc)
+            if torque is not None:
+                self.ga_torque.append(torque)
+                self.ga_load_cycle_torquechange.append(nolc)
+                self.ga_loads.append(next(loads_set))
+        self.ga_statei.extend([self.Degradation.statei] * nolcs.size)
+        self.ga_vibration = vibration[-1, :].reshape(-1, 1) if (vibration is not None) and (out is None) else None
+        # Arguments of the last run (see summary_vibration)
+        self.Vibration.last_run = (nolcs[-1], torque_run, self.ga_statei[-1])
+        if self.ga_checkpoint is not None:
+            self.ga_checkpoint.step(no_steps=nolcs.size)
+        states = dict(states, nolc=nolcs)
+        return(vibration, states)
+
+    def render_vibration(self, recorded_states=None, nolcs=None, out=None,
+                         workers=1, executor='thread'):
+        """
+        Method to render the vibration of given nolcs afterwards, e.g.
+        of a degradation only run (Vibration is initialized at the
+        first call with the initial torque). Same values as run().
+        recorded_states: states returned by run_schedule() ('nolc' and
+        pitting, damage of each gear), nolcs must be recorded there
+        (default all). If None, the states of the given nolcs are
+        taken from this model (see state_at).
+        out, workers, executor: see run_schedule()
+        Returns the vibration (nolcs x samples)
+        """
+        self.init_deferred_vibration()
+        pittings = {}
+        if recorded_states is None:
+            assert nolcs is not None, 'nolcs must be given if no recorded states are given'
+            nolcs = np.asarray(nolcs, dtype=np.float64).reshape(-1)
+            states = [self.state_at(nolc) for nolc in nolcs]
+            for key in ['GearIn', 'GearOut']:
+                if states[0][key] is None:
+                    pittings[key] = None
+                else:
+                    pittings[key] = np.stack([self.Vibration.get_pittings(nolc, statei)[key] for nolc, statei in zip(nolcs, states)])
+        else:
+            nolcs_recorded = np.asarray(recorded_states['nolc'], dtype=np.float64)
+            nolcs = nolcs_recorded if nolcs is None else np.asarray(nolcs, dtype=np.float64).reshape(-1)
+            # Rows of the given nolcs in the recorded states
+            rows = np.minimum(np.searchsorted(nolcs_recorded, nolcs), nolcs_recorded.size - 1)
+            assert np.array_equal(nolcs_recorded[rows], nolcs), 'Given nolcs must be recorded in recorded_states'
+            for key in ['GearIn', 'GearOut']:
+                pittings[key] = None if recorded_states[key] is None else recorded_states[key][0][rows, :]
+        return(self.Vibration.run_vibration_schedule(nolcs, pittings, out=out, workers=workers, executor=executor))
+
+    def init_deferred_vibration(self):
+        """
+        Method to initialize all vibration elements if only the tooth
+        mesh bounds were initialized (degradation_only)
+        """
+        if self.Vibration.signals_initialized():
+            return
+        vibration = self.get_initialized_vibration(self.ga_torque[0])
+        if vibration is None:
+            self.Vibration.init_vibration(self.ga_torque[0])
+            if self.use_vibration_cache():
+                self.vibration_cache.store(self.get_vibration_cache_key(self.ga_torque[0]), self.Vibration)
+        else:
+            self.Vibration = vibration
+        # Keep torque attributes of the current torque
+        self.Vibration.init_torque_attributes(self.ga_torque[-1])
+
+    def state_at(self, nolc):
+        """
+        Method to get the degradation state (statei dict) at any nolc
+        without running the model: states of previous runs are taken
+        from the history, states in between from the torque applied
+        at that time and future states from the current torque (same
+        values as run(nolc) at that point).
+        """
+        return(self.Degradation.state_at(nolc, self.ga_loads[-1]))
+
+    def predict_eol(self, schedule=None, pitting_size=None):
+        """
+        Method to get the nolc at which each failing tooth reaches
+        damage 1 ('nolc_damage') and the given pitting size
+        ('nolc_pitting', default: aeol of each tooth) without running
+        the model, starting at the current state and torque.
+        schedule: list of (nolc, torque), future torque changes as
+        set(nolc, torque) (nolc increasing)
+        Values equal the degradation of run() at each nolc of the
+        schedule and at the returned nolc.
+        Returns a dict with a DataFrame per gear (see
+        Gearbox_Degradation.predict_eol)
+        """
+        schedule = [] if schedule is None else list(schedule)
+        nolcs = [nolc for nolc, _ in schedule]
+        loads = [self.ga_loads[-1]] + [self.Vibration.get_loads(torque) for _, torque in schedule]
+        if len(schedule) > 0:
+            # Restore current torque of vibration
+            self.Vibration.init_torque_attributes(self.ga_torque[-1])
+        return(self.Degradation.predict_eol(loads, nolcs=nolcs, pitting_size=pitting_size))
 
     def set(self, nolc, torque):
         """
@@ -223,6 +477,74 @@ class Gearbox(Vibration,
         # print('### Execution Time "Set": %.3f' % (time.time() - start))
 
 
+    def export_templates(self, min_nbytes=2**16):
+        """
+        Method to export the initialized Vibration to shared memory,
+        see Gearbox_Vibration.export_templates(). Other processes use
+        initialize(torque, templates=handle) with the same arguments
+        and torque as this model was initialized with.
+        """
+        return(self.Vibration.export_templates(min_nbytes=min_nbytes, key=self.ga_vibration_key))
+
+    def save(self, path, min_nbytes=2**12):
+        """
+        Method to save the model (e.g. after initialize()) to directory
+        path: manifest.json and a .npy file per array of at least
+        min_nbytes (no pickle). Restore by Gearbox.load(path).
+        """
+        save_object(self, path, min_nbytes=min_nbytes)
+
+    @classmethod
+    def load(cls, path, mmap_mode='c'):
+        """
+        Method to load a model saved by save(), arrays are memory
+        mapped (copy on write). run() and set() continue as with
+        the saved model.
+        """
+        model = load_object(path, mmap_mode=mmap_mode)
+        assert isinstance(model, cls), 'Snapshot at %s is no %s' % (path, cls.__name__)
+        # Checkpoints are not saved (see enable_checkpoints)
+        model.ga_checkpoint = None
+        return(model)
+
+    def enable_checkpoints(self, path, every=1):
+        """
+        Method to write incremental checkpoints to directory path
+        every n runs (first a full snapshot, afterwards only the
+        states added since the previous checkpoint). Restore by
+        Gearbox.resume(path). A new chain is started, checkpoints
+        already in path are removed (continue them by resume()).
+        """
+        self.ga_checkpoint = Checkpoint(path, self, every=every)
+
+    def checkpoint(self):
+        """
+        Method to write a checkpoint now (see enable_checkpoints)
+        """
+        assert self.ga_checkpoint is not None, 'Call enable_checkpoints() first'
+        self.ga_checkpoint.write()
+
+    @classmethod
+    def resume(cls, path, every=1, mmap_mode='c'):
+        """
+        Method to restore a model at the last checkpoint written to
+        path (state right after run() of the checkpointed nolc, see
+        ga_load_cycle[-1]). Further checkpoints are appended to path
+        every n runs.
+        """
+        model, checkpoint = Checkpoint.resume(path, every=every, mmap_mode=mmap_mode)
+        assert isinstance(model, cls), 'Checkpoint at %s is no %s' % (path, cls.__name__)
+        model.ga_checkpoint = checkpoint
+        return(model)
+
+    def get_statei_history(self, numeric=True):
+        """
+        Method to return all degradation states until the current
+        State. If numeric is True the index is (nolc, 'a'/'d'),
+        else '$a_{nolc}$' and '$d_{nolc}$'.
+        """
+        return(self.Degradation.get_statei_history(numeric=numeric))
+
     def summary(self):
         """
         Method to summary until the current State.
@@ -230,4 +552,8 @@ class Gearbox(Vibration,
         display(HTML('<div style="background-color:rgb(62, 68, 76);color:white;padding:0.5em;letter-spacing:0.1em;font-size:1.5em;align=center"><p><b>Summary Degradation</b></p></div>'))
         self.Degradation.summary_degradation()
         display(HTML('<div style="background-color:rgb(62, 68, 76);color:white;padding:0.5em;letter-spacing:0.1em;font-size:1.5em;align=center"><p><b>Summary Vibration</b></p></div>'))
-        self.Vibration.summary_vibration()
+        if not hasattr(self.Vibration, 'last_run'):
+            display(HTML('<p>No vibration rendered (degradation only, see render_vibration)</p>'))
+        else:
+            self.init_deferred_vibration()
+            self.Vibration.summary_vibration()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import io
+import shutil
+import hashlib
+
+# import 3rd party libarys
+import numpy as np
+
+# import local libarys
+from gearbox.shared import ArrayPickler, ArrayUnpickler
+
+####################################################
+#------------- Persistent Vibration Cache ---------#
+# Initialized vibration models are stored on disk, keyed by a hash of
+# all inputs of init_vibration (element dictionaries, frequencies,
+# sample rate/interval, seed, torque, ...). Each entry is a directory
+# with a small pickle and one .npy file per large array, which are
+# memory mapped (read only) on load. Least recently used entries are
+# removed if the cache exceeds max_bytes.
+
+# Increase if the stored objects change incompatibly
+cache_version = 2
+
+
+def canonical(obj):
+    """
+    Method to get a canonical string of nested dicts, lists, numbers,
+    strings and numpy arrays (dict order does not matter, numbers are
+    represented exactly), other types raise a TypeError
+    """
+    if isinstance(obj, dict):
+        items = sorted((canonical(key), canonical(value)) for key, value in obj.items())
+        return('{%s}' % (','.join('%s:%s' % item for item in items)))
+    elif isinstance(obj, (list, tuple)):
+        return('[%s]' % (','.join(canonical(value) for value in obj)))
+    elif isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        return('array(%s,%s,%s)' % (array.dtype.str, array.shape, hashlib.sha256(array.tobytes()).hexdigest()))
+    elif isinstance(obj, (bool, np.bool_)) or (obj is None) or isinstance(obj, str):
+        return(repr(obj))
+    elif isinstance(obj, (int, np.integer)):
+        return(repr(int(obj)))
+    elif isinstance(obj, (float, np.floating)):
+        return(float(obj).hex())
+    else:
+        # repr of other objects may contain addresses -> no stable key
+        raise TypeError('Object of type %s can not be part of a cache key' % (type(obj).__name__))
+
+
+def get_cache_key(**inputs):
+    """
+    Method to get the cache key (sha256 hex) of the given inputs
+    """
+    inputs['cache_version'] = cache_version
+    return(hashlib.sha256(canonical(inputs).encode('utf-8')).hexdigest())
+
+
+class VibrationCache():
+    """
+    Disk cache for initialized objects (e.g. Gearbox_Vibration).
+    directory: cache directory (created if missing)
+    max_bytes: maximum size of all entries, least recently used
+    entries are removed if exceeded
+    min_nbytes: arrays of at least min_nbytes are stored as .npy
+    """
+
+    def __init__(self, directory, max_bytes=2**32, min_nbytes=2**16):
+        """
+        Class constructor for vibration cache
+        """
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.min_nbytes = min_nbytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_path(self, key):
+        return(os.path.join(self.directory, key))
+
+    def __contains__(self, key):
+        return(os.path.isfile(os.path.join(self.get_path(key), 'object.pkl')))
+
+    def load(self, key):
+        """
+        Method to load an entry, large arrays are memory mapped
+        (read only). Returns None if key is not cached.
+        """
+        path = self.get_path(key)
+        try:
+            with open(os.path.join(path, 'object.pkl'), 'rb') as file:
+                payload = file.read()
+        except FileNotFoundError:
+            return(None)
+        def load_array(pid):
+            return(np.load(os.path.join(path, pid), mmap_mode='r'))
+        obj = ArrayUnpickler(io.BytesIO(payload), load_array).load()
+        # Mark as recently used
+        os.utime(path, None)
+        return(obj)
+
+    def store(self, key, obj):
+        """
+        Method to store an entry (written to a temporary directory
+        first, an existing entry with the same key is kept)
+        """
+        path = self.get_path(key)
+        temp_path = os.path.join(self.directory, '.tmp-%s-%i' % (key, os.getpid()))
+        os.makedirs(temp_path, exist_ok=True)
+        try:
+            names = []
+            def store_array(array):
+                name = 'array%i.npy' % (len(names))
+                np.save(os.path.join(temp_path, name), array, allow_pickle=False)
+                names.append(name)
+                return(name)
+            with open(os.path.join(temp_path, 'object.pkl'), 'wb') as file:
+                ArrayPickler(file, self.min_nbytes, store_array).dump(obj)
+            try:
+                os.rename(temp_path, path)
+            except OSError:
+                # Stored by another process in the meantime
+                pass
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self.evict(keep=[key])
+
+    def entries(self):
+        """
+        Method to return a list of (key, nbytes, last_used) of
+        all entries, least recently used first
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            path = self.get_path(key)
+            if key.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                nbytes = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+                entries.append((key, nbytes, os.path.getmtime(path)))
+            except FileNotFoundError:
+                # Removed by another process in the meantime
+                continue
+        entries.sort(key=lambda entry: entry[2])
+        return(entries)
+
+    def evict(self, keep=[]):
+        """
+        Method to remove least recently used entries until the
+        cache size is not larger than max_bytes
+        """
+        entries = self.entries()
+        total = sum(entry[1] for entry in entries)
+        for key, nbytes, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            shutil.rmtree(self.get_path(key), ignore_errors=True)
+            total -= nbytes
+        return(total)
+
+    def clear(self):
+        """
+        Method to remove all entries
+        """
+        for key, _, _ in self.entries():
+            shutil.rmtree(self.get_path(key), ignore_errors=True)
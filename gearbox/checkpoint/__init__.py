@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import json
+import shutil
+
+# import local libarys
+from gearbox.snapshot import save_object, load_object
+
+####################################################
+#--------------- Incremental Checkpoints ----------#
+# The first checkpoint saves the full model (snapshot), each following
+# checkpoint only the states added since the previous one: the new
+# entries of all growing lists (torques, loads, nolc, damage, pitting),
+# the new rows of the state histories and the current statei (torque
+# attributes of the Vibration are rebuilt from the last torque). The list
+# of valid checkpoints is kept in checkpoint.json, which is replaced
+# atomically after a checkpoint has been written completely. Only
+# Checkpoint.resume() continues an existing chain, a new Checkpoint
+# starts a new chain (previous checkpoints in the directory are removed).
+
+manifest_name = 'checkpoint.json'
+# Growing lists (attribute path of the owner: list attributes)
+growing_lists = {'': ['ga_torque', 'ga_load_cycle_torquechange', 'ga_load_cycle', 'ga_loads', 'ga_statei'],
+                 'Degradation': ['nolc'],
+                 'Degradation.GearIn_Degradation': ['nolc', 'nolc_ref', 'damage', 'pitting_size',
+                                                    'loads_history', 'nolcs_loads'],
+                 'Degradation.GearOut_Degradation': ['nolc', 'nolc_ref', 'damage', 'pitting_size',
+                                                     'loads_history', 'nolcs_loads']}
+# State histories (attribute path)
+histories = ['Degradation.GearIn_Degradation.history',
+             'Degradation.GearOut_Degradation.history']
+# Attributes which are replaced by each run/set (attribute path)
+current_values = ['ga_vibration', 'Degradation.statei']
+
+
+def get_attribute(obj, path, default=None):
+    """
+    Method to get an attribute by path, e.g. 'Degradation.statei'
+    """
+    for name in [name for name in path.split('.') if name != '']:
+        obj = getattr(obj, name, default)
+        if obj is default:
+            return(default)
+    return(obj)
+
+
+def set_attribute(obj, path, value):
+    """
+    Method to set an attribute by path, e.g. 'Degradation.statei'
+    """
+    owner, name = path.rsplit('.', 1) if '.' in path else ('', path)
+    setattr(get_attribute(obj, owner), name, value)
+
+
+class Checkpoint():
+    """
+    Class to write incremental checkpoints of a Gearbox model to
+    directory path. Use Checkpoint.resume(path) to restore the model
+    at the last checkpoint.
+    every: write() is called by step() every n steps (runs)
+    resume: if True, continue the chain in path (model must be the
+    model restored from it), else start a new chain
+    """
+
+    def __init__(self, path, model, every=1, resume=False):
+        """
+        Class constructor for checkpoints
+        """
+        assert every >= 1, 'every must be a positive integer'
+        self.path = os.path.abspath(path)
+        self.every = every
+        self.model = model
+        os.makedirs(self.path, exist_ok=True)
+        if resume:
+            self.no_steps = 0
+            self.manifest = self.read_manifest()
+            # Lengths of lists and histories already on disk
+            self.lengths = self.get_lengths()
+        else:
+            self.start_chain()
+
+    def start_chain(self):
+        """
+        Method to start a new chain (e.g. after the model has been
+        initialized again), the next checkpoint is a full snapshot.
+        Previous checkpoints in path are removed.
+        """
+        previous = self.read_manifest()['checkpoints']
+        self.no_steps = 0
+        self.manifest = {'checkpoints': [], 'nolc': []}
+        self.write_manifest()
+        for name in previous:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        self.lengths = None
+
+    def read_manifest(self):
+        """
+        Method to read the list of valid checkpoints
+        """
+        try:
+            with open(os.path.join(self.path, manifest_name), 'r') as file:
+                return(json.load(file))
+        except FileNotFoundError:
+            return({'checkpoints': [], 'nolc': []})
+
+    def write_manifest(self):
+        """
+        Method to replace the list of valid checkpoints atomically
+        """
+        temp_file = os.path.join(self.path, manifest_name + '.tmp-%i' % (os.getpid()))
+        with open(temp_file, 'w') as file:
+            json.dump(self.manifest, file)
+        os.replace(temp_file, os.path.join(self.path, manifest_name))
+
+    def get_lengths(self):
+        """
+        Method to get the current length of all growing lists
+        and histories of the model
+        """
+        lengths = {}
+        for owner, names in growing_lists.items():
+            for name in names:
+                values = get_attribute(self.model, '%s.%s' % (owner, name) if owner else name)
+                if values is not None:
+                    lengths['%s.%s' % (owner, name) if owner else name] = len(values)
+        for path in histories:
+            history = get_attribute(self.model, path)
+            if history is not None:
+                lengths[path] = len(history)
+        return(lengths)
+
+    def get_increment(self):
+        """
+        Method to get all states added since the last checkpoint
+        """
+        increment = {'lists': {}, 'histories': {}, 'values': {}}
+        for path, length in self.get_lengths().items():
+            if path in histories:
+                # Only the rows added since the previous checkpoint
+                increment['histories'][path] = get_attribute(self.model, path).get_columns(start=self.lengths[path])
+            else:
+                increment['lists'][path] = get_attribute(self.model, path)[self.lengths[path]:]
+        for path in current_values:
+            increment['values'][path] = get_attribute(self.model, path)
+        return(increment)
+
+    def write(self):
+        """
+        Method to write a checkpoint (full snapshot at first,
+        afterwards only the new states)
+        """
+        name = 'checkpoint_%06i' % (len(self.manifest['checkpoints']))
+        if self.lengths is None:
+            save_object(self.model, os.path.join(self.path, name))
+        else:
+            save_object(self.get_increment(), os.path.join(self.path, name))
+        # Checkpoint is only valid after updating the manifest
+        self.manifest['checkpoints'].append(name)
+        self.manifest['nolc'].append(self.model.ga_load_cycle[-1])
+        self.write_manifest()
+        self.lengths = self.get_lengths()
+
+    def step(self, no_steps=1):
+        """
+        Method to count steps (runs) and write a checkpoint
+        every n steps (once if several steps are given)
+        """
+        previous = self.no_steps
+        self.no_steps += no_steps
+        if (self.no_steps // self.every) > (previous // self.every):
+            self.write()
+
+    @classmethod
+    def resume(cls, path, every=1, mmap_mode='c'):
+        """
+        Method to restore the model at the last checkpoint in
+        path. Returns the model and a Checkpoint which continues
+        to write to path.
+        """
+        path = os.path.abspath(path)
+        with open(os.path.join(path, manifest_name), 'r') as file:
+            manifest = json.load(file)
+        assert len(manifest['checkpoints']) > 0, 'No checkpoint found in %s' % (path)
+        model = load_object(os.path.join(path, manifest['checkpoints'][0]), mmap_mode=mmap_mode)
+        for name in manifest['checkpoints'][1:]:
+            increment = load_object(os.path.join(path, name), mmap_mode=mmap_mode)
+            for list_path, values in increment['lists'].items():
+                get_attribute(model, list_path).extend(values)
+            for history_path, (nolc, pitting, damage) in increment['histories'].items():
+                get_attribute(model, history_path).extend(nolc, pitting, damage)
+            for value_path, value in increment['values'].items():
+                set_attribute(model, value_path, value)
+        # torque_in and torque_out of the last torque (as set)
+        model.Vibration.init_torque_attributes(model.ga_torque[-1])
+        checkpoint = cls(path, model, every=every, resume=True)
+        return(model, checkpoint)
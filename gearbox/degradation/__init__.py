@@ -4,7 +4,8 @@
 import os
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
@@ -70,11 +71,13 @@ class Gearbox_Degradation(Gear_Degradation,
         # Init Gear In Degradation
         self.GearIn_Degradation = Gear_Degradation(self.no_teeth_GearIn,
                                                     self.Deg_GearPropIn,
-                                                    self.seed, self.verbose)
+                                                    self.seed, self.verbose,
+                                                    name='GearIn')
         # Init Gear Out Degradation
         self.GearOut_Degradation = Gear_Degradation(self.no_teeth_GearOut,
                                                     self.Deg_GearPropOut,
-                                                    self.seed, self.verbose)
+                                                    self.seed, self.verbose,
+                                                    name='GearOut')
         # Init Bearing1 Degradation
         self.Bearing1_Degradation = Bearing_Degradation(self.Deg_Bearing1Prop,
                                                         self.seed, self.verbose)
@@ -126,6 +129,87 @@ class Gearbox_Degradation(Gear_Degradation,
             return(self.statei)
 
 
+    def run_degradation_schedule(self, nolcs, loads):
+        """
+        Method to get the degradation for all given nolc at once
+        (see Gear_Degradation.run_gear_degradation_schedule).
+        loads: one loads dict per nolc (see Gearbox_Vibration.get_loads)
+        Returns a dict with pitting and damage of all teeth of each
+        gear (tuple of nolcs x teeth arrays, None if no failing teeth)
+        """
+        nolcs = list(nolcs)
+        assert ((self.nolc[-1] is None) or (self.nolc[-1] < nolcs[0])), 'Given nolc argument must be greater than the previous'
+        states = {}
+        states['GearIn'] = self.GearIn_Degradation.run_gear_degradation_schedule(nolcs, [loads_i['GearIn'] for loads_i in loads], nolc_refs=None)
+        nolcs_out = [round(nolc / self.gear_ratio, 3) for nolc in nolcs]
+        states['GearOut'] = self.GearOut_Degradation.run_gear_degradation_schedule(nolcs_out, [loads_i['GearOut'] for loads_i in loads], nolc_refs=nolcs)
+        # statei of the last nolc
+        for key in ['GearIn', 'GearOut']:
+            if states[key] is None:
+                self.statei[key] = None
+            else:
+                self.statei[key] = states[key][2]
+                states[key] = states[key][:2]
+        for key in ['Bearing1', 'Bearing2', 'Bearing3', 'Bearing4']:
+            self.statei[key] = None
+            states[key] = None
+        self.nolc.extend(nolcs)
+        return(states)
+
+    def state_at(self, nolc, loads):
+        """
+        Method to get the degradation state at any nolc without running
+        the degradation (see Gear_Degradation.state_at).
+        loads: loads dict applied after the last nolc
+        Returns a statei dict as run_degradation
+        """
+        statei = {}
+        statei['GearIn'] = self.GearIn_Degradation.state_at(nolc, loads['GearIn'])
+        statei['Bearing1'] = None
+        statei['Bearing2'] = None
+        nolc_out = round(nolc / self.gear_ratio, 3)
+        statei['GearOut'] = self.GearOut_Degradation.state_at(nolc, loads['GearOut'], nolc=nolc_out)
+        statei['Bearing3'] = None
+        statei['Bearing4'] = None
+        return(statei)
+
+    def predict_eol(self, loads, nolcs=None, pitting_size=None):
+        """
+        Method to get the nolc at which each failing tooth reaches
+        damage 1 and the given pitting size without running the
+        degradation (see Gear_Degradation.predict_eol).
+        loads: list of loads dicts, loads[0] is applied from the current
+        nolc, loads[i] from nolcs[i-1] on
+        Returns a dict with a DataFrame per gear (None if no failing
+        teeth), nolc is given in reference to the input shaft
+        """
+        nolcs = [] if nolcs is None else list(nolcs)
+        eol = {}
+        eol['GearIn'] = self.GearIn_Degradation.predict_eol([loads_i['GearIn'] for loads_i in loads], nolcs=nolcs, pitting_size=pitting_size)
+        nolcs_out = [round(nolc / self.gear_ratio, 3) for nolc in nolcs]
+        eol['GearOut'] = self.GearOut_Degradation.predict_eol([loads_i['GearOut'] for loads_i in loads], nolcs=nolcs_out, pitting_size=pitting_size)
+        if eol['GearOut'] is not None:
+            # nolc_in = nolc_out * gear_ratio
+            for column in ['nolc_damage', 'nolc_pitting']:
+                eol['GearOut'][column] = eol['GearOut'][column] * self.gear_ratio
+        for key in ['Bearing1', 'Bearing2', 'Bearing3', 'Bearing4']:
+            eol[key] = None
+        return(eol)
+
+    def get_statei_history(self, numeric=True):
+        """
+        Method to return all states of the gears until the current
+        state (see StateHistory.to_frame)
+        """
+        statei_history = {}
+        statei_history['GearIn'] = self.GearIn_Degradation.get_statei_history(numeric=numeric)
+        statei_history['GearOut'] = self.GearOut_Degradation.get_statei_history(numeric=numeric)
+        statei_history['Bearing1'] = None
+        statei_history['Bearing2'] = None
+        statei_history['Bearing3'] = None
+        statei_history['Bearing4'] = None
+        return(statei_history)
+
     def summary_degradation(self):
         """
         Method to ouput a summary of the degradation states
@@ -4,7 +4,8 @@
 import os
 from copy import deepcopy as dc
 import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
@@ -2,9 +2,11 @@
 
 # import built in libarys
 import os
+from bisect import bisect_right
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
@@ -23,6 +25,8 @@ from gearbox.degradation.helper import Optimizer_Helper
 from gearbox.degradation.helper import State0_Helper
 from gearbox.degradation.helper import Woehler_Helper
 from gearbox.degradation.helper import DamageAcc_Helper
+from gearbox.degradation.helper import StateHistory
+from gearbox.rng import get_rng
 
 ####################################################
 #--------- Gear Degradation Functions ----------------#
@@ -40,10 +44,12 @@ class Gear_Degradation(Degradation_Helper,
                  degdict,
                  seed, # arguments given by parent class
                  verbose=0,
+                 name='Gear',
                  ):
         """
         Constructor method for Gear Degradation
         tbd include sanity checks for given geardict
+        name: element name, used as key of the random number generator
         """
         #BasicHelper.__init__(self)
         self.no_teeth = no_teeth
@@ -63,7 +69,7 @@ class Gear_Degradation(Degradation_Helper,
         self.keeporder_chance = degdict['Chances']['keeporder']
         self.seed = seed
         self.verbose = verbose
-        self.seed_counter = seed
+        self.name = name
         # States:
         self.state0 = None
         # Other
@@ -86,7 +92,12 @@ class Gear_Degradation(Degradation_Helper,
         else:
             self.damage = []
             self.pitting_size = []
-            self.statei = pd.DataFrame()
+            self.history = StateHistory(self.no_teeth)
+            # Loads applied after the history nolc (see add_loads)
+            self.loads_history = []
+            self.nolcs_loads = []
+            # Random number generator keyed by (seed, element)
+            self.rng = get_rng(self.seed, self.name, 'state0')
             # Initialise state0
             self.nolc = [0]
             self.nolc_ref = [0]
@@ -107,12 +118,190 @@ class Gear_Degradation(Degradation_Helper,
             return(None)
         else:
             assert ((self.nolc[-1] <= nolc) or (np.isnan(self.nolc[-1])) or (self.nolc[-1])==0), 'Given nolc argument must be equal or greater than the previous'
+            self.add_loads(self.history.nolc[-1], loads)
             self.nolc.append(nolc)
             self.nolc_ref.append(nolc_ref)
             self.get_damage_growth(loads)
             state_i = self.get_current_statei()
             return(state_i)
 
+    def run_gear_degradation_schedule(self, nolcs, loads, nolc_refs=None):
+        """
+        Method to get the degradation for all given nolc at once (same
+        values as run_gear_degradation for each nolc). loads: one loads
+        object per nolc (applied since the previous nolc), the damage
+        is calculated once per piecewise constant loads segment.
+        Returns pitting and damage of all teeth (nolcs x teeth) and
+        the statei of the last nolc.
+        """
+        if ((self.no_failing is None) or (self.no_failing==0)):
+            return(None)
+        nolcs = list(nolcs)
+        assert len(loads) == len(nolcs), 'One loads object per nolc must be given'
+        assert ((self.nolc[-1] <= nolcs[0]) or (self.nolc[-1]==0)), 'Given nolc argument must be equal or greater than the previous'
+        # Load cycles since the previous nolc (as integer)
+        n_fracs = np.floor(np.diff(np.array([self.nolc[-1]] + nolcs, dtype=np.float64))).astype(np.int64)
+        assert np.all(n_fracs >= 0), 'Given nolcs must be increasing'
+        if nolc_refs is None:
+            nolc_refs = [None] * len(nolcs)
+            nolcs_history = nolcs
+        else:
+            nolc_refs = list(nolc_refs)
+            nolcs_history = nolc_refs
+        # Damage fractions per loads segment
+        damage_fracs = np.empty((len(nolcs), self.s0_tooth.size))
+        start = 0
+        for stop in range(1, len(nolcs)+1):
+            if (stop == len(nolcs)) or (loads[stop] is not loads[start]):
+                damage_fracs[start:stop, :] = self.get_damage_fractions(loads[start], n_fracs[start:stop])
+                self.add_loads(self.history.nolc[-1] if start == 0 else nolcs_history[start-1], loads[start])
+                start = stop
+        # Accumulate damage (sequential cumsum, same values as step by step)
+        damage = np.cumsum(np.concatenate([np.reshape(self.damage[-1], (1, -1)), damage_fracs], axis=0), axis=0)[1:, :]
+        pitting = self.get_pitting_size(damage)
+        # Pitting and damage of all teeth (nan for remaining teeth)
+        pitting_all = np.full((len(nolcs), self.no_teeth), np.nan)
+        damage_all = np.full((len(nolcs), self.no_teeth), np.nan)
+        pitting_all[:, self.s0_tooth - 1] = pitting
+        damage_all[:, self.s0_tooth - 1] = damage
+        # Append states
+        self.nolc.extend(nolcs)
+        self.nolc_ref.extend(nolc_refs)
+        self.damage.extend(list(damage))
+        self.pitting_size.extend(list(pitting))
+        self.history.extend(nolcs_history, pitting_all, damage_all)
+        state_i = self.get_statei_frame(nolcs_history[-1], pitting_all[-1, :], damage_all[-1, :])
+        return(pitting_all, damage_all, state_i)
+
+    def add_loads(self, nolc_ref, loads):
+        """
+        Method to record the loads applied after the state of the
+        given nolc (reference of the history), once per loads object.
+        Used by state_at and predict_eol for previous states.
+        """
+        if (len(self.loads_history) == 0) or (loads is not self.loads_history[-1]):
+            self.loads_history.append(loads)
+            self.nolcs_loads.append(float(nolc_ref))
+
+    def get_loads_after(self, idx, loads):
+        """
+        Method to get the loads applied after the state idx of the
+        history, given loads are applied after the last state
+        """
+        if idx == len(self.history) - 1:
+            return(loads)
+        # Bisection of the recorded loads (nolcs_loads increasing)
+        return(self.loads_history[bisect_right(self.nolcs_loads, self.history.nolc[idx]) - 1])
+
+    def state_at(self, nolc_ref, loads, nolc=None):
+        """
+        Method to get the degradation state at any nolc without running
+        the degradation (previous states are not changed). Recorded
+        states are taken from the history, states in between (or after
+        the last nolc) are the recorded state before plus the damage of
+        the load cycles since, same values as run_gear_degradation.
+        nolc_ref: nolc in reference of the history (input shaft)
+        loads: loads applied after the last nolc (previous loads are
+        recorded by run_gear_degradation)
+        nolc: nolc of this gear (default nolc_ref)
+        Returns the statei DataFrame of nolc_ref
+        """
+        if ((self.no_failing is None) or (self.no_failing==0)):
+            return(None)
+        if nolc is None:
+            nolc = nolc_ref
+        # Previous recorded state by bisection of the sorted history
+        nolcs_history = self.history.nolc
+        assert nolc_ref >= nolcs_history[0], 'Given nolc must be equal or greater than the first nolc'
+        idx = int(np.searchsorted(nolcs_history, nolc_ref, side='right')) - 1
+        if nolcs_history[idx] == nolc_ref:
+            pitting, damage = self.history.get_state(nolc_ref)
+            return(self.get_statei_frame(nolc_ref, pitting, damage))
+        # Loads applied after the previous recorded state
+        n_frac = int(np.floor(nolc - self.nolc[idx]))
+        damage_failing = self.damage[idx] + self.get_damage_fractions(self.get_loads_after(idx, loads), [n_frac])[0]
+        # Pitting and damage of all teeth (nan for remaining teeth)
+        pitting = np.full(self.no_teeth, np.nan)
+        damage = np.full(self.no_teeth, np.nan)
+        pitting[self.s0_tooth - 1] = self.get_pitting_size(damage_failing)
+        damage[self.s0_tooth - 1] = damage_failing
+        return(self.get_statei_frame(nolc_ref, pitting, damage))
+
+    def predict_eol(self, loads, nolcs=None, pitting_size=None):
+        """
+        Method to get the nolc at which each failing tooth reaches
+        damage 1 and the given pitting size (default: aeol of each
+        tooth) without running the degradation. Damage is linear in
+        the load cycles of each piecewise constant loads segment, the
+        crossing is solved in closed form starting at the current state.
+        loads: list of loads, loads[0] is applied from the current nolc,
+        loads[i] from nolcs[i-1] on (nolcs: increasing, len(loads)-1)
+        Values already reached are solved from the previous state and
+        the loads recorded by run_gear_degradation, inf if never reached.
+        Values equal run_gear_degradation called at each nolc of
+        nolcs and at the returned nolc.
+        Returns a DataFrame (one row per failing tooth as in state0)
+        """
+        if ((self.no_failing is None) or (self.no_failing==0)):
+            return(None)
+        nolcs = [] if nolcs is None else list(nolcs)
+        assert len(loads) == len(nolcs) + 1, 'One loads object per segment must be given (len(nolcs) + 1)'
+        bounds = np.array([self.nolc[-1]] + nolcs + [np.inf], dtype=np.float64)
+        assert np.all(np.diff(bounds) >= 0), 'Given nolcs must be increasing and not smaller than the current nolc'
+        if pitting_size is None:
+            pitting_size = self.s0_aeol
+        targets = {'nolc_damage': np.ones(self.s0_tooth.size),
+                   'nolc_pitting': self.get_damage_from_pitting_size(pitting_size)}
+        damage_all = np.array(self.damage)
+        eol = pd.DataFrame({'tooth': self.s0_tooth,
+                            'pitting_size': np.broadcast_to(pitting_size, self.s0_tooth.shape).astype(np.float64)})
+        for column, target in targets.items():
+            nolc_eol = np.full(self.s0_tooth.size, np.inf)
+            nolc_eol[np.isnan(target)] = np.nan
+            # Already reached in previous states
+            reached = damage_all >= target
+            done = np.any(reached, axis=0)
+            nolc_eol[done] = self.get_past_crossings(target, np.argmax(reached, axis=0), done)[done]
+            # Segment by segment from the current state
+            damage = self.damage[-1].copy()
+            open_teeth = ~done & ~np.isnan(target)
+            for idx, loads_i in enumerate(loads):
+                if not np.any(open_teeth):
+                    break
+                rates = self.get_damage_rates(loads_i)
+                cycles = self.get_cycles2damage(damage, rates, target)
+                # Load cycles of this segment (as run_gear_degradation)
+                n_frac = bounds[idx+1] - bounds[idx]
+                n_frac = np.inf if np.isinf(n_frac) else int(np.floor(n_frac))
+                found = open_teeth & (cycles <= n_frac)
+                nolc_eol[found] = bounds[idx] + cycles[found]
+                open_teeth = open_teeth & ~found
+                if not np.isinf(n_frac):
+                    damage = damage + np.array([self.sum_repeat2no_values(rate, n_frac) for rate in rates])
+            eol[column] = nolc_eol
+        return(eol)
+
+    def get_past_crossings(self, target, idx_reached, done):
+        """
+        Method to get the nolc at which each failing tooth reached the
+        target damage before the current state. idx_reached: index of
+        the first state with damage >= target (if done), the crossing is
+        solved in closed form from the state before and the loads
+        applied after it (see state_at).
+        """
+        nolc_eol = np.full(self.s0_tooth.size, np.nan)
+        for idx in np.unique(idx_reached[done]):
+            teeth = done & (idx_reached == idx)
+            if idx == 0:
+                # Reached in the initial state
+                nolc_eol[teeth] = self.nolc[0]
+                continue
+            # Loads applied after the previous state
+            rates = self.get_damage_rates(self.get_loads_after(idx-1, None))
+            cycles = self.get_cycles2damage(self.damage[idx-1], rates, target)
+            nolc_eol[teeth] = self.nolc[idx-1] + cycles[teeth]
+        return(nolc_eol)
+
     def summary_gear_degradation(self):
         """
         Method to ouput a summary of the degradation states
@@ -140,3 +329,13 @@ class Gear_Degradation(Degradation_Helper,
             display(pd.DataFrame(self.pitting_size, index=index).T)
             display(HTML('<p>Legend: %s)</p>' % (' | '.join(legend))))
             self.plot_pitting_size()
+
+    def get_statei_history(self, numeric=True):
+        """
+        Method to return all states until the current state as
+        DataFrame (see StateHistory.to_frame)
+        """
+        if ((self.no_failing is None) or (self.no_failing==0)):
+            return(None)
+        else:
+            return(self.history.to_frame(numeric=numeric))
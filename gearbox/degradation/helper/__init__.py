@@ -4,23 +4,25 @@
 import os
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
-from itertools import product as cart_prod
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 from math import log
 
 # import 3rd party libarys
 import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
+# from matplotlib import pyplot as plt
+from gearbox.lazy import plt
 # import time
 # from scipy.signal import gausspulse
 # from sklearn.preprocessing import MinMaxScaler
 # from scipy.stats import norm
-from numpy.random import uniform
+# from numpy.random import uniform
 # from scipy.optimize import brute
-from sklearn.metrics import mean_squared_error
+# from sklearn.metrics import mean_squared_error
 
 # import local libarys
+from gearbox.vibration.helper import ToothLoads
 
 
 ####################################################
@@ -53,6 +55,32 @@ class Degradation_Helper():
                                   np.s_[no_values:], axis=0)
         return(repeat_vector)
 
+    def sum_repeat2no_values(self, vector, no_values):
+        """
+        Sum of repeat2no_values(vector, no_values) without creating
+        the repeat_vector. Full repetitions are given by the sum of
+        the vector, the remainder by its prefix sum.
+        Given a 2D array, the sum is calculated along the last axis.
+        """
+        vector = np.asarray(vector)
+        no_values = int(no_values)
+        repetitions, remainder = divmod(no_values, vector.shape[-1])
+        return(repetitions * np.sum(vector, axis=-1) + np.sum(vector[..., :remainder], axis=-1))
+
+    def sum_repeat2no_values_array(self, vector, no_values):
+        """
+        Vectorized sum_repeat2no_values for an array of no_values,
+        returns one sum per given no_values (first axis). Prefix sums
+        are calculated once per remainder.
+        """
+        vector = np.asarray(vector)
+        no_values = np.asarray(no_values, dtype=np.int64).reshape(-1)
+        repetitions, remainders = np.divmod(no_values, vector.shape[-1])
+        total = np.sum(vector, axis=-1)
+        remainders_unique, inverse = np.unique(remainders, return_inverse=True)
+        prefix = np.stack([np.sum(vector[..., :remainder], axis=-1) for remainder in remainders_unique])
+        return(np.multiply.outer(repetitions, total) + prefix[inverse])
+
     def non_uniform_cdf(self, array):
         """
         Method to get a non uniform cdf from a given array
@@ -75,13 +103,7 @@ class Degradation_Helper():
         condition, i = [False], 1
         while any(condition) is False:
             # Get random uniform number
-            if self.seed is not None:
-                np.random.seed(self.seed_counter)
-                if self.seed_counter < 2**16: # pretend exceeding seed limit
-                    self.seed_counter += int(uniform(low=1, high=10, size=1))
-                else:
-                    self.seed_counter = int(uniform(low=1, high=10, size=1))
-            random_nr = uniform(low=0.0, high=1.0, size=1)
+            random_nr = self.rng.uniform(low=0.0, high=1.0, size=1)
             # Calculate lower condition (Insert a 0 at index 0)
             cond1 = (np.insert(chances_cdf, 0, 0) < random_nr)
             # Calculate upper condition (Append a 1 as last entry)
@@ -90,9 +112,6 @@ class Degradation_Helper():
             condition = np.logical_and(cond1, cond2)
             condition = np.delete(condition, -1, axis=0)
             # Workaround "while" to cover probabilitys of exact 0 and 1
-            # Set new seed for drawing random_nr
-        if self.seed is not None:
-            np.random.seed(self.seed)
         return(condition)
 
     def reorder_list_given_indexes(self, indexes, lst):
@@ -195,49 +214,49 @@ class Optimizer_Helper():
         x = float(x)
         return(x)
 
-    def inner_loop(self, x, y, theta1, theta2, theta3, no_states):
+    def inv_exp_function_array(self, y, theta1, theta2, theta3):
         """
-        Method representanting inner loop for opt_exp_function_brute
+        Elementwise version of inv_exp_function for arrays of
+        y and thetas (invalid logarithm arguments return -999)
         """
-        fval = dict()
-        fval['theta1'], fval['theta2'], fval['theta3'] = theta1, theta2, theta3
-        fval['x_train'], fval['y_train'] = x, y
-        try:
-            y_pred = self.exp_function(x, theta1, theta2, theta3)
-            y_pred = y_pred.flatten()
-            fval['y_pred'] = y_pred
-            if self.exp_function(np.array(0), theta1, theta2, theta3) <= 0:
-                fval['rmse'] = np.nan
-            else:
-                fval['rmse'] = mean_squared_error(y, y_pred)
-        except:
-            fval['y_pred'] = np.nan
-            fval['rmse'] = np.nan
-        # Out Progress --> Costs an enourmous amount of speed
-        if self.verbose == 1:
-            if self.curr_state % 1000 == 0:
-                self.prgr_bar(self.curr_state, no_states, txt='')
-        #self.curr_state += 1
-        return(fval)
-
-    def opt_exp_function_brute(self, x, y, theta1s,
-                               theta2s, theta3s):
-        """
-        """
-        # Parameters to display progress
-        no_states = theta1s.size * theta2s.size * theta3s.size
-        theta_combs = list(cart_prod(theta1s, theta2s, theta3s))
-        # Init Pool for Multiprocessing
-        df_val = [self.inner_loop(x, y, theta1, theta2, theta3, no_states) for theta1, theta2, theta3 in theta_combs]
-        # Check if all combinations are done
-        assert len(df_val) == no_states, 'Internal Failure of Brute Force GridSearch'
-        df_val = pd.DataFrame(df_val)
-        # To tackle display mistakes
-        if self.verbose == 1:
-            self.prgr_bar(no_states, no_states, txt=u'\u2713')
-        # Reset curr_state
-        self.curr_state = 1
-        return(df_val)
+        arg = (np.asarray(y, dtype=np.float64) - theta3) / theta1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.log(arg) / theta2
+        x[arg <= 0] = -999
+        return(x)
+
+    def opt_exp_function_grid(self, x, y, theta1s,
+                              theta2s, theta3s, chunk_size=2**20):
+        """
+        Grid search of the exp function parameters. The whole
+        grid (theta1s x theta2s x theta3s) is scored by broadcasting
+        in chunks of theta1 (max. chunk_size predictions per chunk).
+        Returns the thetas with minimal mse (first one in cartesian
+        product order) and the minimal mse. If no valid combination exists nan is returned.
+        """
+        x = np.array(x, dtype=np.float64).reshape(-1)
+        y = np.array(y, dtype=np.float64).reshape(-1)
+        # exp(theta2 * x) is independent of theta1 and theta3
+        exp_t2x = np.exp(theta2s.reshape(-1, 1, 1) * x.reshape(1, 1, -1))
+        theta3_grid = theta3s.reshape(1, 1, -1, 1)
+        # Number of theta1 values per chunk
+        chunk_theta1 = max(1, chunk_size // (theta2s.size * theta3s.size * x.size))
+        mse = np.full((theta1s.size, theta2s.size, theta3s.size), np.nan)
+        with np.errstate(over='ignore', invalid='ignore'):
+            for start in range(0, theta1s.size, chunk_theta1):
+                theta1_grid = theta1s[start:start+chunk_theta1].reshape(-1, 1, 1, 1)
+                y_pred = theta1_grid * exp_t2x.reshape(1, theta2s.size, 1, -1) + theta3_grid
+                mse_i = np.mean(np.square(y - y_pred), axis=-1)
+                # Not finite predictions are invalid
+                mse_i[~np.all(np.isfinite(y_pred), axis=-1)] = np.nan
+                # Predictions at x=0 smaller or equal to zero are invalid
+                y_zero = theta1_grid[..., 0] + theta3_grid[..., 0]
+                mse_i[np.broadcast_to(y_zero <= 0, mse_i.shape)] = np.nan
+                mse[start:start+chunk_theta1] = mse_i
+        if np.all(np.isnan(mse)):
+            return(np.nan, np.nan, np.nan, np.nan)
+        id1, id2, id3 = np.unravel_index(np.nanargmin(mse), mse.shape)
+        return(theta1s[id1], theta2s[id2], theta3s[id3], mse[id1, id2, id3])
 
     def run_optimizer4state0(self, failure_range):
         """
@@ -258,14 +277,11 @@ class Optimizer_Helper():
                          self.state0.loc[idx, 'aeol']))
             if self.verbose == 1:
                 display(HTML('<p>Running for tooth %i failure</p>' % (self.state0.loc[idx, 'tooth'])))
-            fval = self.opt_exp_function_brute(x, y, self.theta1s,
-                                               self.theta2s, self.theta3s)
-            # self.state0['fval'][idx] = fval
-            rmse_min = (fval[fval['rmse'] == fval['rmse'].min()])
-            self.state0.loc[idx, 'theta1'] = rmse_min['theta1'].values
-            self.state0.loc[idx, 'theta2'] = rmse_min['theta2'].values
-            self.state0.loc[idx, 'theta3'] = rmse_min['theta3'].values
-            del fval
+            theta1, theta2, theta3, _ = self.opt_exp_function_grid(x, y, self.theta1s,
+                                                                   self.theta2s, self.theta3s)
+            self.state0.loc[idx, 'theta1'] = theta1
+            self.state0.loc[idx, 'theta2'] = theta2
+            self.state0.loc[idx, 'theta3'] = theta3
 
 
 ####################################################
@@ -284,22 +300,22 @@ class State0_Helper():
     def init_n0s(self):
         """
         """
-        return(self.p_n0.rvs(size=self.no_teeth))
+        return(self.p_n0.rvs(size=self.no_teeth, random_state=self.rng))
 
     def init_a0s(self):
         """
         """
-        return(self.p_a0.rvs(size=self.no_teeth))
+        return(self.p_a0.rvs(size=self.no_teeth, random_state=self.rng))
 
     def init_neols(self):
         """
         """
-        return(self.p_neol.rvs(size=self.no_teeth))
+        return(self.p_neol.rvs(size=self.no_teeth, random_state=self.rng))
 
     def init_aeols(self):
         """
         """
-        return(self.p_aeol.rvs(size=self.no_teeth))
+        return(self.p_aeol.rvs(size=self.no_teeth, random_state=self.rng))
 
     def get_teeth_init_chances(self, drawn_teeth):
         """
@@ -390,11 +406,11 @@ class State0_Helper():
             drawn_teeth.append(teeth[condition][0])
         return(drawn_teeth)
 
-    def get_initial_values(self, seed=None):
+    def get_initial_values(self):
         """
         Method to get a0, n0, aeol, neol, tooth
+        (random values are drawn from self.rng)
         """
-        np.random.seed(seed)
         self.state0 = pd.DataFrame()
         # Add a0 and n0
         self.state0['a0'] = self.init_a0s().reshape(-1)
@@ -434,20 +450,13 @@ class State0_Helper():
         function defined by estimated theta1, theta2,
         theta3
         """
-        # Iterate over all failing tooth
         new_df = dc(self.state0)
         new_df['n0_old'] = self.state0['n0']
         new_df['neol_old'] = self.state0['neol']
-
-        for index, row in self.state0.iterrows():
-            new_df.loc[index, 'n0'] = self.inv_exp_function(row['a0'],
-                                                            row['theta1'],
-                                                            row['theta2'],
-                                                            row['theta3'])
-            new_df.loc[index, 'neol'] = self.inv_exp_function(row['aeol'],
-                                                              row['theta1'],
-                                                              row['theta2'],
-                                                              row['theta3'])
+        # All failing tooth at once
+        thetas = [self.state0[theta].to_numpy() for theta in ['theta1', 'theta2', 'theta3']]
+        new_df['n0'] = self.inv_exp_function_array(self.state0['a0'].to_numpy(), *thetas)
+        new_df['neol'] = self.inv_exp_function_array(self.state0['aeol'].to_numpy(), *thetas)
         self.state0 = new_df
 
     def check_valid_state0(self):
@@ -474,15 +483,8 @@ class State0_Helper():
         """
         valid = False
         while not(valid):
-            # Get random uniform number
-            if self.seed is not None:
-                np.random.seed(self.seed_counter)
-                if self.seed_counter < 2**16: # pretend exceeding seed limit
-                    self.seed_counter += int(uniform(low=1, high=10, size=1))
-                else:
-                    self.seed_counter = int(uniform(low=1, high=10, size=1))
             # Get a0, n0, aeol, neol, tooth
-            self.get_initial_values(seed=self.seed_counter)
+            self.get_initial_values()
             # Get exp parameter theta1, theta2, theta3
             self.run_optimizer4state0(np.arange(0, self.no_failing, 1))
             # Get an Backup of state0
@@ -498,9 +500,22 @@ class State0_Helper():
                 self.match_a2function()
                 # Check again if adjustment leads to still valid values
                 valid = self.check_valid_state0()
-        # Reset Seed
-        if self.seed is not None:
-            np.random.seed(self.seed)
+        self.get_state0_arrays()
+
+    def get_state0_arrays(self):
+        """
+        Method to store the columns of state0 as contiguous numpy
+        arrays (one value per failing tooth, same order as state0).
+        Damage and pitting are calculated on these arrays.
+        """
+        self.s0_tooth = self.state0['tooth'].to_numpy(dtype=np.int64)
+        self.s0_a0 = self.state0['a0'].to_numpy(dtype=np.float64)
+        self.s0_n0 = self.state0['n0'].to_numpy(dtype=np.float64)
+        self.s0_aeol = self.state0['aeol'].to_numpy(dtype=np.float64)
+        self.s0_neol = self.state0['neol'].to_numpy(dtype=np.float64)
+        self.s0_theta1 = self.state0['theta1'].to_numpy(dtype=np.float64)
+        self.s0_theta2 = self.state0['theta2'].to_numpy(dtype=np.float64)
+        self.s0_theta3 = self.state0['theta3'].to_numpy(dtype=np.float64)
 
     def plot_state0(self):
 
@@ -581,12 +596,9 @@ class DamageAcc_Helper():
         """
         Method to get damage at nolc=0
         """
-        damage = []
-        for index, row in self.state0.iterrows():
-            dnorm = row['neol'] - row['n0']
-            ddiff = 0 - row['neol']
-            damage.append((ddiff / dnorm) + 1)
-        self.damage.append(damage)
+        dnorm = self.s0_neol - self.s0_n0
+        ddiff = 0 - self.s0_neol
+        self.damage.append((ddiff / dnorm) + 1)
 
     def get_corresponding_pitting_size(self):
         """
@@ -594,28 +606,19 @@ class DamageAcc_Helper():
         size a for a given self.nolc and level of
         damage.
         """
-        # Get df containing state0 and damage
-        pitting_size = []
-        for index, row in self.state0.iterrows():
-            damage = self.damage[-1][index]
-            # If damage is a negative number
-            if damage < 0:
-                pitting_size.append(np.nan)
-            elif damage >= 0:
-                dnorm = row['neol'] - row['n0']
-                ref_nolc = damage * dnorm + row['n0']
-                pitting = self.exp_function(ref_nolc,
-                                            row['theta1'],
-                                            row['theta2'],
-                                            row['theta3'])
-                # Reduce pitting to type scaler
-                while isinstance(pitting, (list, tuple, np.ndarray)):
-                    pitting = pitting[0]
-                pitting_size.append(pitting)
-            # If damage is for example nan
-            else:
-                pitting_size.append(np.nan)
-        self.pitting_size.append(pitting_size)
+        self.pitting_size.append(self.get_pitting_size(self.damage[-1]))
+
+    def get_pitting_size(self, damage):
+        """
+        Method to get the pitting size a for the given damage of
+        each failing tooth (last axis, e.g. steps x failing teeth)
+        """
+        dnorm = self.s0_neol - self.s0_n0
+        ref_nolc = damage * dnorm + self.s0_n0
+        pitting_size = self.s0_theta1 * np.exp(self.s0_theta2 * ref_nolc) + self.s0_theta3
+        # No pitting if damage is negative (or e.g. nan)
+        pitting_size[~(damage >= 0)] = np.nan
+        return(pitting_size)
 
     def get_initial_damage(self):
         """
@@ -632,54 +635,105 @@ class DamageAcc_Helper():
         Method to get the Damage fraction for the load cycle
         fraction between given nolc and previous nolc. While
         the given loads is applied in this nolc fraction
-        (loads must be dict, with key tooth number (starting
-        with 1) and a list of loads as values)
-        """
-        # Define number of load cycles
-        # Get initial damage values and corresponding pitting
-        damage_frac = []
-        # Iterate over failing tooth
-        for index, row in self.state0.iterrows():
-            # print('Failing tooth %s' % (str(int(row['tooth']))))
-            # Iterate over loads list
-            damage_equivalent = []
-            # iterrows transforms tooth int to float -> backtransform:
-            for load in loads[str(int(row['tooth']))]:
-                # print('Load i at tooth: %.3f' % (load))
-                # Get Woehler Reference Values at D=1
-                N1 = row['neol'] - row['n0']
-                T1 = self.woehler_torqp
-                k = self.woehler_k
-                # Get values of interest at D=1
-                N2 = N1 * np.power((load / T1), -1*k)
-                T2 = load
-                # Add to damage aquivalent
-                # list of damages for one load cycle
-                # print('Damage equivalent: %.3f' % (1/N2))
-                damage_equivalent.append(1/N2)
-            # print('List of damage equiv.: %s' % (str(damage_equivalent)))
-            # Change dtype to numpy array
-            damage_equivalent = np.array(damage_equivalent)
-            # Get Fraction
-            n_frac = self.nolc[-1] - self.nolc[-2]
-            # Fraction as integer (incase of e.g outer gear and )
-            n_frac = int(np.floor(n_frac))
-            # print('Number of load cycles: %i' % (n_frac))
-            # Repeat damage_equivalent
-            damage_equivalent = self.repeat2no_values(damage_equivalent, n_frac)
-            # print('Shape of damage equivalent: %s' % (damage_equivalent.shape))
-            damage_frac.append(np.sum(damage_equivalent))
-            # print('Damage Fraction: %s' % (str(damage_frac)))
-
-        # Change type
-        damage_frac = np.array(damage_frac)
-        # print('Damage Fraction all teeth: %s' % (str(damage_frac)))
+        (loads must be ToothLoads or dict, with key tooth number
+        (starting with 1) and a list of loads as values)
+        """
+        # Get Fraction
+        n_frac = self.nolc[-1] - self.nolc[-2]
+        # Fraction as integer (incase of e.g outer gear and )
+        n_frac = int(np.floor(n_frac))
+        damage_frac = self.get_damage_fractions(loads, [n_frac])[0]
         # Accumulate new damage
-        damage = dc(np.array(self.damage[-1]) + damage_frac)
-        # Add new state
-        self.damage.append(damage.tolist())
+        self.damage.append(self.damage[-1] + damage_frac)
         self.get_corresponding_pitting_size()
 
+    def get_damage_fractions(self, loads, n_fracs):
+        """
+        Method to get the damage fraction of each failing tooth for
+        each given number of load cycles (n_fracs) while the given
+        loads are applied (returns steps x failing teeth)
+        """
+        # Get Woehler Reference Values at D=1
+        N1 = (self.s0_neol - self.s0_n0).reshape(-1, 1)
+        T1 = self.woehler_torqp
+        k = self.woehler_k
+        if isinstance(loads, ToothLoads) and loads.equal_counts:
+            # Teeth x meshes array, row is tooth number - 1
+            loads_failing = loads.array[self.s0_tooth - 1, :]
+        else:
+            # ToothLoads or dict {str(tooth): loads}
+            loads_failing = [np.asarray(loads[str(tooth)], dtype=np.float64) for tooth in self.s0_tooth]
+        if isinstance(loads_failing, np.ndarray) or len(set(load.size for load in loads_failing)) == 1:
+            # Values of interest at D=1 for all failing tooth at once
+            N2 = N1 * np.power((np.stack(loads_failing) / T1), -1*k)
+            # Sum of damage equivalent repeated to n_frac values
+            damage_fracs = self.sum_repeat2no_values_array(1/N2, n_fracs)
+        else:
+            # Different number of loads per tooth
+            damage_fracs = np.stack([self.sum_repeat2no_values_array(1/(N1[idx] * np.power((load / T1), -1*k)), n_fracs)
+                                     for idx, load in enumerate(loads_failing)], axis=1)
+        return(damage_fracs)
+
+    def get_damage_rates(self, loads):
+        """
+        Method to get the damage of each load cycle of one load
+        period for each failing tooth (list of vectors, the damage
+        of n load cycles is sum_repeat2no_values(vector, n))
+        """
+        # Get Woehler Reference Values at D=1
+        N1 = self.s0_neol - self.s0_n0
+        T1 = self.woehler_torqp
+        k = self.woehler_k
+        if isinstance(loads, ToothLoads) and loads.equal_counts:
+            loads_failing = list(loads.array[self.s0_tooth - 1, :])
+        else:
+            # ToothLoads or dict {str(tooth): loads}
+            loads_failing = [np.asarray(loads[str(tooth)], dtype=np.float64) for tooth in self.s0_tooth]
+        return([1/(N1[idx] * np.power((load / T1), -1*k)) for idx, load in enumerate(loads_failing)])
+
+    def get_damage_from_pitting_size(self, pitting_size):
+        """
+        Method to get the damage of each failing tooth at which
+        the given pitting size is reached (inverse of get_pitting_size,
+        nan if pitting size is not reachable)
+        """
+        dnorm = self.s0_neol - self.s0_n0
+        pitting_size = np.broadcast_to(np.asarray(pitting_size, dtype=np.float64), self.s0_n0.shape)
+        ref_nolc = self.inv_exp_function_array(pitting_size, self.s0_theta1, self.s0_theta2, self.s0_theta3)
+        damage = (ref_nolc - self.s0_n0) / dnorm
+        damage[ref_nolc == -999] = np.nan
+        return(damage)
+
+    def get_cycles2damage(self, damage, rates, damage_target):
+        """
+        Method to get the smallest number of load cycles until
+        damage + sum_repeat2no_values(rates, n) >= damage_target
+        for each failing tooth (closed form by full load periods and
+        the prefix sum of the remainder, inf if not reachable)
+        """
+        cycles = np.full(len(rates), np.inf)
+        for idx, rate in enumerate(rates):
+            need = damage_target[idx] - damage[idx]
+            if np.isnan(need):
+                cycles[idx] = np.nan
+                continue
+            if need <= 0:
+                cycles[idx] = 0
+                continue
+            # Prefix sums, prefix[r]: damage of the first r load cycles
+            prefix = np.concatenate([[0], np.cumsum(rate)])
+            total = prefix[-1]
+            if total <= 0:
+                continue
+            # Full load periods and load cycles of the remainder
+            repetitions = int(np.floor(need / total))
+            remainder = int(np.searchsorted(prefix, need - repetitions * total, side='left'))
+            if remainder >= prefix.size:
+                repetitions += 1
+                remainder = int(np.searchsorted(prefix, need - repetitions * total, side='left'))
+            cycles[idx] = repetitions * rate.size + remainder
+        return(cycles)
+
     def plot_helper(self, y, string):
         """
         Method to plot the pitting growth
@@ -730,32 +784,148 @@ class DamageAcc_Helper():
         """
         Method to return a list of all teeth and the corresponding pitting size
         """
-        # Array of allt tooth
-        all_tooth = np.arange(1, self.no_teeth+1, 1)
-        # List of failed tooth, damage and pitting
-        failed_tooth = self.state0['tooth'].to_numpy()
-        failed_tooth = failed_tooth.reshape(1, -1)
-        failed_pitting = np.array(self.pitting_size[-1])
-        failed_pitting = failed_pitting.reshape(1, -1)
-        failed_damage = np.array(self.damage[-1])
-        failed_damage = failed_damage.reshape(1, -1)
-        failed = np.concatenate([failed_tooth, failed_pitting, failed_damage], axis=0)
-        # Remaining tooth, damage and pitting
-        rem_tooth = [tooth for tooth in all_tooth if tooth not in failed_tooth]
-        rem_tooth = np.array(rem_tooth).reshape(1, -1)
-        rem_pitting = np.full(rem_tooth.shape, np.nan)
-        rem_damage = np.full(rem_tooth.shape, np.nan)
-        rem = np.concatenate([rem_tooth, rem_pitting, rem_damage], axis=0)
-        # Concat remaining and failed
-        alle = np.concatenate([failed, rem], axis=1)
-        df = pd.DataFrame(alle[1:, :])
+        # Pitting and damage of all tooth (nan for remaining tooth)
+        pitting = np.full(self.no_teeth, np.nan)
+        damage = np.full(self.no_teeth, np.nan)
+        pitting[self.s0_tooth - 1] = self.pitting_size[-1]
+        damage[self.s0_tooth - 1] = self.damage[-1]
         # If gear is output gear than nolc=nolc_in/gear_ratio so for a
         # uniform description nolc_ref is given as the value of nolc_in
-        df.columns = alle[0, :]
         if self.nolc_ref[-1] is None:
-            df.index = ['$a_{%i}$' % (self.nolc[-1]), '$d_{%i}$' % (self.nolc[-1])]
+            nolc = self.nolc[-1]
         else:
-            df.index = ['$a_{%i}$' % (self.nolc_ref[-1]), '$d_{%i}$' % (self.nolc_ref[-1])]
-        df = df.reindex(sorted(df.columns), axis=1)
-        self.statei = pd.concat([self.statei, df], axis=0)
+            nolc = self.nolc_ref[-1]
+        # Add to history (no copy of previous states)
+        self.history.append(nolc, pitting, damage)
+        return(self.get_statei_frame(nolc, pitting, damage))
+
+    def get_statei_frame(self, nolc, pitting, damage):
+        """
+        Method to return the statei DataFrame (rows pitting a and
+        damage d, one column per tooth) for the given nolc
+        """
+        df = pd.DataFrame(np.stack([pitting, damage], axis=0),
+                          index=['$a_{%i}$' % (nolc), '$d_{%i}$' % (nolc)],
+                          columns=np.arange(1, self.no_teeth+1, 1, dtype=np.float64))
         return(df)
+
+
+####################################################
+# --------- State History Functions ---------------#
+
+
+class StateHistory():
+    """
+    Growable columnar store for pitting and damage of each tooth
+    per number of load cycle (nolc). Rows are written into
+    preallocated buffers (capacity doubled if full, amortized
+    constant time per append), columns are views of the buffers.
+    """
+
+    def __init__(self, no_teeth, capacity=1024):
+        """
+        Class constructor for the state history
+        """
+        self.no_teeth = no_teeth
+        self.size = 0
+        self.nolcs = np.full(capacity, np.nan)
+        self.pittings = np.full((capacity, no_teeth), np.nan)
+        self.damages = np.full((capacity, no_teeth), np.nan)
+
+    def __len__(self):
+        return(self.size)
+
+    def append(self, nolc, pitting, damage):
+        """
+        Method to append the state (pitting and damage of each tooth)
+        for the given nolc. nolc must be equal or greater than the
+        previous nolc.
+        """
+        self.reserve(self.size + 1)
+        self.nolcs[self.size] = nolc
+        self.pittings[self.size, :] = pitting
+        self.damages[self.size, :] = damage
+        self.size += 1
+
+    def extend(self, nolcs, pitting, damage):
+        """
+        Method to append the states of several nolc at once
+        (pitting and damage: nolcs x teeth)
+        """
+        nolcs = np.asarray(nolcs, dtype=np.float64).reshape(-1)
+        stop = self.size + nolcs.size
+        self.reserve(stop)
+        self.nolcs[self.size:stop] = nolcs
+        self.pittings[self.size:stop, :] = pitting
+        self.damages[self.size:stop, :] = damage
+        self.size = stop
+
+    def reserve(self, size):
+        """
+        Method to grow the buffers to at least size rows
+        """
+        if size > self.nolcs.shape[0]:
+            capacity = max(size, 2 * self.nolcs.shape[0])
+            for name in ['nolcs', 'pittings', 'damages']:
+                buffer = getattr(self, name)
+                grown = np.full((capacity, ) + buffer.shape[1:], np.nan)
+                grown[:self.size] = buffer[:self.size]
+                setattr(self, name, grown)
+
+    def get_columns(self, start=0):
+        """
+        Method to return nolc, pitting and damage from row start on
+        (shape: (len,), (len, no_teeth), (len, no_teeth)) as views,
+        which are not changed by further appends.
+        """
+        return(self.nolcs[start:self.size], self.pittings[start:self.size],
+               self.damages[start:self.size])
+
+    @property
+    def nolc(self):
+        return(self.nolcs[:self.size])
+
+    @property
+    def pitting(self):
+        return(self.pittings[:self.size])
+
+    @property
+    def damage(self):
+        return(self.damages[:self.size])
+
+    def get_index(self, nolc):
+        """
+        Method to return the row index of the given nolc (last
+        row if nolc has been given multiple times).
+        """
+        idx = np.searchsorted(self.nolc, nolc, side='right') - 1
+        if ((idx < 0) or (self.nolc[idx] != nolc)):
+            raise KeyError('nolc %s not in state history' % (str(nolc)))
+        return(int(idx))
+
+    def get_state(self, nolc):
+        """
+        Method to return pitting and damage of each tooth for the
+        given nolc.
+        """
+        idx = self.get_index(nolc)
+        return(self.pittings[idx, :].copy(), self.damages[idx, :].copy())
+
+    def to_frame(self, numeric=True):
+        """
+        Method to return the history as DataFrame, two rows (pitting a
+        and damage d) per nolc, one column per tooth. If numeric is
+        True the index is (nolc, 'a'/'d'), else the string labels
+        '$a_{nolc}$' and '$d_{nolc}$' are used.
+        """
+        nolc, pitting, damage = self.get_columns()
+        values = np.stack([pitting, damage], axis=1).reshape(-1, self.no_teeth)
+        if numeric is True:
+            index = pd.MultiIndex.from_arrays([np.repeat(nolc, 2),
+                                               np.tile(['a', 'd'], nolc.size)],
+                                              names=['nolc', 'state'])
+            columns = np.arange(1, self.no_teeth+1, 1)
+        else:
+            index = [label % (n) for n in nolc for label in ['$a_{%i}$', '$d_{%i}$']]
+            columns = np.arange(1, self.no_teeth+1, 1, dtype=np.float64)
+        return(pd.DataFrame(values, index=index, columns=columns))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import multiprocessing
+from copy import deepcopy as dc
+
+# import 3rd party libarys
+import numpy as np
+
+# import local libarys
+from gearbox import Gearbox
+
+####################################################
+#---------------- Fleet Simulation ----------------#
+# Monte Carlo simulation of many gearboxes (one per seed) with the
+# same element dictionaries. Each worker process initializes the
+# model (incl. Vibration) once and afterwards only reinitializes
+# the Degradation for each seed (see Gearbox.reinitialize).
+
+# Gearbox element dictionaries expected in a GearboxParams module
+param_keys = ['GearIn', 'GearOut',
+              'Bearing1', 'Bearing2', 'Bearing3', 'Bearing4',
+              'Deg_GearIn', 'Deg_GearOut',
+              'Deg_Bearing1', 'Deg_Bearing2', 'Deg_Bearing3', 'Deg_Bearing4',
+              'GearDegVibDictIn', 'GearDegVibDictOut']
+
+# Model of the current worker process
+worker_state = {}
+
+
+def params_from_module(module, rotational_frequency_in, sample_interval,
+                       sample_rate, **kwargs):
+    """
+    Method to get the Gearbox arguments from a GearboxParams
+    module (e.g. import GearboxParams) and the given scalars.
+    Further keyword arguments (seed, fixed_start, ...) are passed
+    to Gearbox.
+    """
+    params = {key: dc(getattr(module, key)) for key in param_keys if hasattr(module, key)}
+    params['rotational_frequency_in'] = rotational_frequency_in
+    params['sample_interval'] = sample_interval
+    params['sample_rate'] = sample_rate
+    params.update(kwargs)
+    return(params)
+
+
+def init_model(params, torque, templates=None):
+    """
+    Method to get an initialized model of the given Gearbox
+    arguments (Vibration is attached from shared memory if
+    templates are given)
+    """
+    params = dict(params)
+    params['verbose'] = 0
+    model = Gearbox(**params)
+    model.initialize(torque, templates=templates)
+    return(model)
+
+
+def init_worker(params, torque, schedule, templates=None):
+    """
+    Method to initialize the model of a worker process
+    (Vibration is initialized once per worker or attached
+    from shared memory if templates are given)
+    """
+    worker_state['model'] = init_model(params, torque, templates=templates)
+    worker_state['torque'] = torque
+    worker_state['schedule'] = schedule
+
+
+def run_seed(seed):
+    """
+    Method to run the schedule for one seed in the worker process
+    (see run_model_seed)
+    """
+    return(run_model_seed(worker_state['model'], worker_state['torque'],
+                          worker_state['schedule'], seed))
+
+
+def run_model_seed(model, torque, schedule, seed):
+    """
+    Method to run the schedule for one seed on the given model.
+    Returns the seed and a dict with the nolc, vibration and statei
+    of each step of the schedule.
+    """
+    model.reinitialize(torque, seed=seed)
+    result = {'nolc': [], 'vibration': [], 'statei': []}
+    for nolc, torque_i in schedule:
+        vibration = model.run(nolc, output=True)
+        result['nolc'].append(nolc)
+        result['vibration'].append(vibration)
+        result['statei'].append(dc(model.ga_statei[-1]))
+        # Set new torque for the following load cycles
+        if torque_i is not None:
+            model.set(nolc, torque_i)
+    return((seed, result))
+
+
+class Gearbox_Fleet():
+    """
+    Class to simulate a fleet of gearboxes with identical element
+    dictionaries (given as Gearbox arguments, see params_from_module)
+    and different seeds on a process pool.
+    schedule: list of (nolc, torque), at each step model.run(nolc) is
+    called and afterwards model.set(nolc, torque) if torque is not None
+    """
+
+    def __init__(self, params, torque, schedule, processes=None,
+                 start_method=None, shared_templates=False):
+        """
+        Class constructor.
+        processes: number of worker processes (None: os.cpu_count(),
+        1: run in the current process without pool)
+        shared_templates: if True, Vibration is initialized once in this
+        process and attached by all workers from shared memory
+        """
+        assert isinstance(params, dict), 'params must be a dict of Gearbox arguments'
+        self.params = params
+        self.torque = np.asarray(torque)
+        self.schedule = [(nolc, None if torque_i is None else np.asarray(torque_i)) for nolc, torque_i in schedule]
+        assert len(self.schedule) > 0, 'schedule must contain at least one (nolc, torque) step'
+        nolcs = [nolc for nolc, _ in self.schedule]
+        assert all(np.diff(nolcs) > 0), 'nolc in schedule must be strictly increasing'
+        self.processes = processes
+        self.start_method = start_method
+        self.shared_templates = shared_templates
+
+    def run(self, seeds, chunksize=1, ordered=False):
+        """
+        Method to run the schedule for all given seeds. Returns a
+        generator of (seed, result) as soon as a seed is done
+        (ordered=False) or in order of the given seeds (ordered=True).
+        """
+        seeds = list(seeds)
+        if self.processes == 1:
+            # Local model, worker_state is only used by pool workers
+            model = init_model(self.params, self.torque)
+            for seed in seeds:
+                yield(run_model_seed(model, self.torque, self.schedule, seed))
+            return
+        templates = None
+        if self.shared_templates:
+            templates = init_model(self.params, self.torque).export_templates()
+        context = multiprocessing.get_context(self.start_method)
+        try:
+            with context.Pool(processes=self.processes, initializer=init_worker,
+                              initargs=(self.params, self.torque, self.schedule, templates)) as pool:
+                if ordered:
+                    results = pool.imap(run_seed, seeds, chunksize=chunksize)
+                else:
+                    results = pool.imap_unordered(run_seed, seeds, chunksize=chunksize)
+                for seed_result in results:
+                    yield(seed_result)
+        finally:
+            if templates is not None:
+                templates.unlink()
+
+    def run_all(self, seeds, chunksize=1):
+        """
+        Method to run the schedule for all given seeds and return
+        a dict {seed: result}
+        """
+        return(dict(self.run(seeds, chunksize=chunksize, ordered=False)))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+from importlib import import_module
+
+####################################################
+#------------- Lazy Import Accessors --------------#
+# Notebook (IPython), plotting (matplotlib) and signal processing
+# (scipy.signal) are only imported on first use. A headless process
+# can import gearbox and run a degradation without loading them
+# (e.g. worker pools).
+
+
+class LazyModule():
+    """
+    Placeholder for a module, which is imported on first
+    attribute access. E.g. plt = LazyModule('matplotlib.pyplot')
+    """
+
+    def __init__(self, name):
+        """
+        Class constructor for lazy module
+        """
+        self.lazy_name = name
+        self.lazy_module = None
+
+    def __getattr__(self, attr):
+        # Only called if attribute is not found regularly
+        if attr.startswith('lazy_'):
+            raise AttributeError(attr)
+        if self.lazy_module is None:
+            self.lazy_module = import_module(self.lazy_name)
+        return(getattr(self.lazy_module, attr))
+
+
+plt = LazyModule('matplotlib.pyplot')
+
+
+def display(*args, **kwargs):
+    """
+    IPython.display.display, falls back to print if
+    IPython is not installed
+    """
+    try:
+        from IPython.display import display as ipy_display
+    except ImportError:
+        print(*args)
+        return
+    ipy_display(*args, **kwargs)
+
+
+def HTML(*args, **kwargs):
+    """
+    IPython.display.HTML, falls back to the given
+    string if IPython is not installed
+    """
+    try:
+        from IPython.display import HTML as ipy_HTML
+    except ImportError:
+        return(args[0] if len(args) > 0 else kwargs.get('data'))
+    return(ipy_HTML(*args, **kwargs))
+
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+from zlib import crc32
+
+# import 3rd party libarys
+import numpy as np
+
+####################################################
+#------------ Random Number Generators ------------#
+# Each gearbox element owns its own np.random.Generator derived
+# from a SeedSequence keyed by (model seed, element, purpose, nolc).
+# Streams do not depend on global numpy state or on the order in
+# which elements or load cycles are simulated.
+
+
+def key2int(key):
+    """
+    Method to convert a key (string or number) to a non negative
+    integer usable in a SeedSequence spawn key. Strings are hashed
+    (crc32), numbers are taken by their float64 bit pattern
+    (e.g. nolc 1000 and 1000.0 lead to the same key).
+    """
+    if isinstance(key, str):
+        return((0, crc32(key.encode('utf-8'))))
+    else:
+        return((1, int(np.float64(key).view(np.uint64))))
+
+
+def get_seed_sequence(seed, *keys):
+    """
+    Method to get a SeedSequence for a given model seed and keys.
+    If seed is None, fresh entropy from the OS is used (not
+    reproducible).
+    """
+    spawn_key = tuple(value for key in keys for value in key2int(key))
+    return(np.random.SeedSequence(entropy=seed, spawn_key=spawn_key))
+
+
+def get_rng(seed, *keys):
+    """
+    Method to get a np.random.Generator for a given model seed and
+    keys. E.g. get_rng(seed, 'GearIn', 'run', nolc)
+    """
+    return(np.random.Generator(np.random.PCG64(get_seed_sequence(seed, *keys))))
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import io
+import pickle
+from multiprocessing import shared_memory
+
+# import 3rd party libarys
+import numpy as np
+
+####################################################
+#------------- Shared Memory Templates ------------#
+# An initialized object (e.g. Gearbox_Vibration) is pickled, while all
+# large numpy arrays (base_signal, teeth_signal, ids_bounds_torque,
+# degradation impulses, ...) are placed in multiprocessing.shared_memory
+# blocks instead of the pickle. Other processes attach the blocks and
+# get read only views, so N workers share one copy of the arrays.
+
+
+def attach_shared_memory(name):
+    """
+    Method to attach an existing shared memory block. Only the
+    exporting process unlinks the block (track=False, Python >= 3.13;
+    before, pool workers share the resource tracker of the parent).
+    """
+    try:
+        return(shared_memory.SharedMemory(name=name, create=False, track=False))
+    except TypeError:
+        return(shared_memory.SharedMemory(name=name, create=False))
+
+
+class ArrayPickler(pickle.Pickler):
+    """
+    Pickler which stores numpy arrays of at least min_nbytes
+    outside of the pickle by store_array(array) -> pid
+    """
+
+    def __init__(self, file, min_nbytes, store_array):
+        """
+        Class constructor for array pickler
+        """
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.min_nbytes = min_nbytes
+        self.store_array = store_array
+        self.memo_ids = {}
+
+    def persistent_id(self, obj):
+        if ((not isinstance(obj, np.ndarray)) or (obj.dtype.hasobject) or (obj.nbytes < self.min_nbytes)):
+            return(None)
+        # Same array referenced several times -> stored once
+        if id(obj) not in self.memo_ids:
+            # Keep obj alive, so that its id is not reused during pickling
+            self.memo_ids[id(obj)] = (self.store_array(obj), obj)
+        return(self.memo_ids[id(obj)][0])
+
+
+class ArrayUnpickler(pickle.Unpickler):
+    """
+    Unpickler which restores the arrays stored by ArrayPickler
+    by load_array(pid) -> array
+    """
+
+    def __init__(self, file, load_array):
+        """
+        Class constructor for array unpickler
+        """
+        pickle.Unpickler.__init__(self, file)
+        self.load_array = load_array
+        self.arrays = {}
+
+    def persistent_load(self, pid):
+        if pid not in self.arrays:
+            self.arrays[pid] = self.load_array(pid)
+        return(self.arrays[pid])
+
+
+class SharedTemplates():
+    """
+    Handle of an object exported to shared memory. The handle itself
+    is small and can be pickled (e.g. passed to pool workers), the
+    object is restored by attach(). The exporting process must keep
+    the handle and call unlink() when all workers are done.
+    """
+
+    def __init__(self, obj, min_nbytes=2**16, key=None):
+        """
+        Class constructor, exports obj
+        min_nbytes: smaller arrays are pickled as usual
+        key: identifies the arguments obj was created with (e.g. a
+        vibration cache key), checked by the attaching process
+        """
+        blocks = []
+        def store_array(array):
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            blocks.append(block)
+            shared_array = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            shared_array[...] = array
+            return((block.name, array.shape, array.dtype.str))
+        buffer = io.BytesIO()
+        try:
+            ArrayPickler(buffer, min_nbytes, store_array).dump(obj)
+        except BaseException:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            raise
+        self.payload = buffer.getvalue()
+        self.key = key
+        self.names = [block.name for block in blocks]
+        self.nbytes = sum(block.size for block in blocks)
+        # Blocks are only owned by the exporting process
+        self.blocks = blocks
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['blocks'] = []
+        return(state)
+
+    def attach(self):
+        """
+        Method to restore the exported object, large arrays are read
+        only views on the shared memory. The blocks are kept open as
+        long as the returned object exists (attribute shared_blocks).
+        """
+        blocks = {}
+        def load_array(pid):
+            name, shape, dtype = pid
+            if name not in blocks:
+                blocks[name] = attach_shared_memory(name)
+            array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            array.flags.writeable = False
+            return(array)
+        obj = ArrayUnpickler(io.BytesIO(self.payload), load_array).load()
+        obj.shared_blocks = blocks
+        return(obj)
+
+    def close(self):
+        """
+        Method to close the blocks in the exporting process
+        """
+        for block in self.blocks:
+            block.close()
+
+    def unlink(self):
+        """
+        Method to close and free the blocks (exporting process only)
+        """
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        self.unlink()
+
+
+def copy_sharing_arrays(obj):
+    """
+    Method to copy an object (e.g. one Gearbox_Vibration per thread),
+    all numpy arrays are shared with obj instead of copied, all other
+    attributes (random number generators, ...) are copied
+    """
+    arrays = []
+    def store_array(array):
+        arrays.append(array)
+        return(len(arrays) - 1)
+    # Shared memory blocks stay with obj (they keep the arrays alive)
+    state = {key: value for key, value in vars(obj).items() if key != 'shared_blocks'}
+    buffer = io.BytesIO()
+    ArrayPickler(buffer, 0, store_array).dump(state)
+    copy = type(obj).__new__(type(obj))
+    copy.__dict__.update(ArrayUnpickler(io.BytesIO(buffer.getvalue()), lambda pid: arrays[pid]).load())
+    return(copy)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import json
+import shutil
+from importlib import import_module
+
+# import 3rd party libarys
+import numpy as np
+import pandas as pd
+
+####################################################
+#------------------ Model Snapshot ----------------#
+# Save and restore an object graph (e.g. an initialized Gearbox) without
+# pickle: a JSON manifest describes all objects, numpy arrays of at least
+# min_nbytes are stored as .npy files and memory mapped on load (copy on
+# write, files are never changed). Only objects of gearbox classes and a
+# few known types (numpy, pandas, scipy.stats frozen distributions) can
+# be saved and loaded, any other type raises a TypeError.
+
+manifest_name = 'manifest.json'
+snapshot_version = 1
+# Attributes which are not saved (process specific)
+skip_attributes = ['shared_blocks', 'ga_checkpoint']
+
+
+def is_gearbox_module(module):
+    """
+    Method to check if objects of the given module can be saved
+    and loaded (gearbox and its subpackages only)
+    """
+    return((module == 'gearbox') or module.startswith('gearbox.'))
+
+
+class SnapshotWriter():
+    """
+    Class to encode an object graph to a JSON serializable
+    manifest, large arrays are written to the given directory
+    """
+
+    def __init__(self, directory, min_nbytes=2**12):
+        """
+        Class constructor for snapshot writer
+        """
+        self.directory = directory
+        self.min_nbytes = min_nbytes
+        self.no_arrays = 0
+        # Memo of arrays and objects by id -> shared references are kept
+        self.memo = {}
+
+    def encode(self, obj):
+        """
+        Method to encode a given object
+        """
+        if (obj is None) or isinstance(obj, (bool, str)):
+            return(obj)
+        if isinstance(obj, np.generic):
+            return({'__type__': 'numpy.scalar', 'dtype': obj.dtype.str, 'value': obj.item()})
+        if isinstance(obj, (int, float)):
+            return(obj)
+        if isinstance(obj, list):
+            return([self.encode(value) for value in obj])
+        if isinstance(obj, tuple):
+            return({'__type__': 'tuple', 'items': [self.encode(value) for value in obj]})
+        if isinstance(obj, dict):
+            if all(isinstance(key, str) and not(key.startswith('__')) for key in obj):
+                return({key: self.encode(value) for key, value in obj.items()})
+            return({'__type__': 'dict', 'items': [[self.encode(key), self.encode(value)] for key, value in obj.items()]})
+        # Arrays and objects are encoded once, further references point to the first
+        if id(obj) in self.memo:
+            return({'__ref__': self.memo[id(obj)][0]})
+        self.memo[id(obj)] = (len(self.memo), obj)
+        encoded = self.encode_object(obj)
+        encoded['__id__'] = self.memo[id(obj)][0]
+        return(encoded)
+
+    def encode_object(self, obj):
+        """
+        Method to encode arrays, pandas and gearbox objects
+        """
+        if isinstance(obj, np.ndarray):
+            return(self.encode_array(obj))
+        if isinstance(obj, pd.DataFrame):
+            return({'__type__': 'pandas.DataFrame',
+                    'columns': self.encode_index(obj.columns),
+                    'index': self.encode_index(obj.index),
+                    'data': [self.encode_array(obj.iloc[:, idx].to_numpy()) for idx in range(obj.shape[1])]})
+        if isinstance(obj, pd.Series):
+            return({'__type__': 'pandas.Series', 'name': self.encode(obj.name),
+                    'index': self.encode_index(obj.index),
+                    'data': self.encode_array(obj.to_numpy())})
+        if isinstance(obj, np.random.Generator):
+            return({'__type__': 'numpy.Generator',
+                    'bit_generator': type(obj.bit_generator).__name__,
+                    'state': self.encode(obj.bit_generator.state)})
+        if type(obj).__module__.startswith('scipy.stats') and hasattr(obj, 'dist'):
+            return({'__type__': 'scipy.stats.frozen', 'name': obj.dist.name,
+                    'args': self.encode(list(obj.args)), 'kwds': self.encode(obj.kwds)})
+        if is_gearbox_module(type(obj).__module__):
+            state = {key: value for key, value in vars(obj).items() if key not in skip_attributes}
+            return({'__type__': 'object', 'module': type(obj).__module__,
+                    'class': type(obj).__qualname__, 'state': self.encode(state)})
+        raise TypeError('Object of type %s.%s can not be saved' % (type(obj).__module__, type(obj).__qualname__))
+
+    def encode_array(self, array):
+        """
+        Method to encode an array, small arrays are stored in
+        the manifest, large ones as .npy file
+        """
+        if array.dtype.hasobject:
+            return({'__type__': 'numpy.object_array', 'shape': list(array.shape),
+                    'items': self.encode(array.reshape(-1).tolist())})
+        if array.nbytes < self.min_nbytes:
+            return({'__type__': 'numpy.array', 'dtype': array.dtype.str,
+                    'shape': list(array.shape), 'items': array.reshape(-1).tolist()})
+        name = 'array%i.npy' % (self.no_arrays)
+        self.no_arrays += 1
+        np.save(os.path.join(self.directory, name), array, allow_pickle=False)
+        return({'__type__': 'numpy.npy', 'file': name})
+
+    def encode_index(self, index):
+        """
+        Method to encode a pandas index
+        """
+        if isinstance(index, pd.RangeIndex):
+            return({'__type__': 'pandas.RangeIndex', 'start': index.start,
+                    'stop': index.stop, 'step': index.step, 'name': self.encode(index.name)})
+        return({'__type__': 'pandas.Index', 'name': self.encode(index.name),
+                'data': self.encode_array(index.to_numpy())})
+
+
+class SnapshotReader():
+    """
+    Class to decode a manifest written by SnapshotWriter
+    """
+
+    def __init__(self, directory, mmap_mode='c'):
+        """
+        Class constructor for snapshot reader
+        """
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.memo = {}
+
+    def decode(self, obj):
+        """
+        Method to decode a given manifest entry
+        """
+        if isinstance(obj, list):
+            return([self.decode(value) for value in obj])
+        if not isinstance(obj, dict):
+            return(obj)
+        if '__ref__' in obj:
+            return(self.memo[obj['__ref__']])
+        if '__type__' not in obj:
+            return({key: self.decode(value) for key, value in obj.items()})
+        kind = obj['__type__']
+        if kind == 'numpy.scalar':
+            return(np.dtype(obj['dtype']).type(obj['value']))
+        if kind == 'tuple':
+            return(tuple(self.decode(value) for value in obj['items']))
+        if kind == 'dict':
+            return({self.decode(key): self.decode(value) for key, value in obj['items']})
+        if kind == 'object':
+            # Only gearbox classes (as written), a manifest must not import others
+            if not is_gearbox_module(obj['module']):
+                raise TypeError('Object of module %s can not be loaded' % (obj['module']))
+            cls = import_module(obj['module'])
+            for name in obj['class'].split('.'):
+                cls = getattr(cls, name)
+            if not (isinstance(cls, type) and is_gearbox_module(cls.__module__)):
+                raise TypeError('Object of type %s.%s can not be loaded' % (obj['module'], obj['class']))
+            # Register object before decoding its state (cyclic references)
+            instance = cls.__new__(cls)
+            self.memo[obj['__id__']] = instance
+            instance.__dict__.update(self.decode(obj['state']))
+            return(instance)
+        decoded = self.decode_object(obj)
+        if '__id__' in obj:
+            self.memo[obj['__id__']] = decoded
+        return(decoded)
+
+    def decode_object(self, obj):
+        """
+        Method to decode arrays, pandas and other known objects
+        """
+        kind = obj['__type__']
+        if kind == 'numpy.npy':
+            return(np.load(os.path.join(self.directory, obj['file']), mmap_mode=self.mmap_mode))
+        if kind == 'numpy.array':
+            return(np.array(obj['items'], dtype=np.dtype(obj['dtype'])).reshape(obj['shape']))
+        if kind == 'numpy.object_array':
+            array = np.empty(len(obj['items']), dtype=object)
+            array[:] = self.decode(obj['items'])
+            return(array.reshape(obj['shape']))
+        if kind == 'pandas.DataFrame':
+            columns = self.decode_index(obj['columns'])
+            data = {idx: self.decode(column) for idx, column in enumerate(obj['data'])}
+            frame = pd.DataFrame(data, index=self.decode_index(obj['index']))
+            frame.columns = columns
+            return(frame)
+        if kind == 'pandas.Series':
+            return(pd.Series(self.decode(obj['data']), index=self.decode_index(obj['index']),
+                             name=self.decode(obj['name'])))
+        if kind == 'numpy.Generator':
+            bit_generator = getattr(np.random, obj['bit_generator'])()
+            bit_generator.state = self.decode(obj['state'])
+            return(np.random.Generator(bit_generator))
+        if kind == 'scipy.stats.frozen':
+            from scipy import stats
+            return(getattr(stats, obj['name'])(*self.decode(obj['args']), **self.decode(obj['kwds'])))
+        raise TypeError('Unknown snapshot type %s' % (kind))
+
+    def decode_index(self, obj):
+        """
+        Method to decode a pandas index
+        """
+        if obj['__type__'] == 'pandas.RangeIndex':
+            return(pd.RangeIndex(obj['start'], obj['stop'], obj['step'], name=self.decode(obj['name'])))
+        return(pd.Index(self.decode(obj['data']), name=self.decode(obj['name'])))
+
+
+def save_object(obj, path, min_nbytes=2**12):
+    """
+    Method to save an object graph to directory path (manifest.json
+    and .npy files). An existing snapshot at path is replaced, it is
+    moved aside and only removed after the new snapshot is in place.
+    """
+    path = os.path.abspath(path)
+    if os.path.exists(path):
+        assert os.path.isfile(os.path.join(path, manifest_name)), 'Given path exists and is no snapshot: %s' % (path)
+    temp_path = path + '.tmp-%i' % (os.getpid())
+    old_path = path + '.old-%i' % (os.getpid())
+    os.makedirs(temp_path, exist_ok=False)
+    try:
+        writer = SnapshotWriter(temp_path, min_nbytes=min_nbytes)
+        manifest = {'snapshot_version': snapshot_version,
+                    'object': writer.encode(obj)}
+        with open(os.path.join(temp_path, manifest_name), 'w') as file:
+            json.dump(manifest, file)
+        if os.path.exists(path):
+            os.rename(path, old_path)
+            try:
+                os.rename(temp_path, path)
+            except OSError:
+                # Put the old snapshot back
+                os.rename(old_path, path)
+                raise
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            os.rename(temp_path, path)
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+
+def load_object(path, mmap_mode='c'):
+    """
+    Method to load an object graph saved by save_object(). Large
+    arrays are memory mapped (mmap_mode 'c': copy on write, 'r':
+    read only, None: load into memory).
+    """
+    path = os.path.abspath(path)
+    with open(os.path.join(path, manifest_name), 'r') as file:
+        manifest = json.load(file)
+    assert manifest['snapshot_version'] == snapshot_version, 'Snapshot version %s is not supported' % (str(manifest['snapshot_version']))
+    return(SnapshotReader(path, mmap_mode=mmap_mode).decode(manifest['object']))
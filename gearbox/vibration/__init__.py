@@ -2,19 +2,23 @@
 
 # import built in libarys
 import os
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 # import time
 
 # import 3rd party libarys
 import numpy as np
 import pandas as pd
-from matplotlib import pyplot as plt
+# from matplotlib import pyplot as plt
+from gearbox.lazy import plt
 # from scipy.signal import gausspulse
 # from sklearn.preprocessing import MinMaxScaler
 # from scipy.stats import norm
-from numpy.random import uniform
+# from numpy.random import uniform
 # from scipy.optimize import brute
 # from sklearn.metrics import mean_squared_error
 
@@ -22,6 +26,33 @@ from numpy.random import uniform
 from gearbox.vibration.bearing import Bearing
 from gearbox.vibration.gear import Gear
 from gearbox.vibration.helper import BasicHelper
+from gearbox.rng import get_rng
+from gearbox.shared import SharedTemplates
+from gearbox.shared import copy_sharing_arrays
+
+####################################################
+#-------------- Parallel Window Rendering ----------#
+# Vibration of the worker process (see run_vibration_schedule)
+worker_state = {}
+
+
+def init_render_worker(templates):
+    """
+    Method to attach the Vibration of a render worker process
+    from shared memory
+    """
+    worker_state['vibration'] = templates.attach()
+
+
+def render_chunk(args):
+    """
+    Method to render the vibration of a chunk of nolcs in the
+    worker process, returns the first index and the signals
+    """
+    start, nolcs, pittings = args
+    signals = worker_state['vibration'].run_vibration_schedule(nolcs, pittings)
+    return((start, signals))
+
 
 ####################################################
 #------------------- Vibration Model ---------------------#
@@ -43,9 +74,21 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
                  seed=None,
                  fixed_start=False,
                  GearDegVibDictIn=None,
-                 GearDegVibDictOut=None
+                 GearDegVibDictOut=None,
+                 gear_synthesis='matrix',
+                 window_synthesis=True,
+                 lean=True
                  ):
         """
+        gear_synthesis: 'matrix' or 'overlap_add' (see Gear)
+        window_synthesis: if True and fixed_start is False, the random
+        window is picked first and only its samples are synthesized from
+        master signals of the full sample time (calculated once at
+        init_vibration), else all signals are synthesized over the full
+        sample time and trimmed afterwards
+        lean: if True, run_vibration adds all element signals in place to
+        one output column, the element signals are only kept (rendered
+        again) for summary_vibration()
         """
         BasicHelper.__init__(self)
         self.rotational_frequency_in = rotational_frequency_in
@@ -62,6 +105,10 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         self.fixed_start = fixed_start
         self.GearDegVibDictIn = GearDegVibDictIn
         self.GearDegVibDictOut = GearDegVibDictOut
+        self.gear_synthesis = gear_synthesis
+        self.window_synthesis = window_synthesis
+        self.lean = lean
+        self.signals_kept = False
         self.signal_degr = None
         self.init_missing()
 
@@ -118,6 +165,15 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         length (0 -> sample_interval) [sec] and number
         of samples per second.
         """
+        self.get_window_ids()
+        return(signal[self.start_id:self.stop_id, :])
+
+    def get_window_ids(self):
+        """
+        Method to pick the window (start_id, stop_id) of the
+        real sample time in the full sample time (random start
+        if fixed_start is False)
+        """
         if self.fixed_start is True:
             self.start_id = 0
             self.stop_id = self.real_sample_time.size
@@ -128,13 +184,13 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
             # Diff
             diff_no_samples = full_no_samples - real_no_samples
             # Get random start id and consecutive end
-            start_id = uniform(low=0.0, high=diff_no_samples, size=1)
+            start_id = self.rng.uniform(low=0.0, high=diff_no_samples, size=1)[0]
             start_id = int(start_id)
             stop_id = start_id + real_no_samples
             # IDs to instance arguments
             self.start_id = start_id
             self.stop_id = stop_id
-        return(signal[self.start_id:self.stop_id, :])
+        return((self.start_id, self.stop_id))
 
     def init_missing(self):
         """
@@ -146,6 +202,8 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
             self.temp_sample_time = self.real_sample_time
         else:
             self.temp_sample_time = self.torque_sample_time
+        # Synthesize only the samples of the random window
+        self.synthesize_window = (self.window_synthesis is True) and (self.fixed_start is not True)
         self.check_declaration(self.GearPropIn, key='no_teeth', message='')
         self.check_declaration(self.GearPropOut, key='no_teeth', message='')
         self.gear_ratio =  self.GearPropOut['no_teeth']/self.GearPropIn['no_teeth']
@@ -185,23 +243,25 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         loads['Bearing4'] = 'tbd'
         return(loads)
 
-    def get_degr_signal(self, nolc, statei):
+    def get_degr_signal(self, nolc, statei, window=None):
         """
         Method to get the load collectives corresponding to
         the gearbox elements. This method is in vibration
         because here factors as time of tooth meshing
         are known, which are needed to accumulate the loads
+        window: (start_id, stop_id), only these samples are synthesized
         """
+        no_samples = self.temp_sample_time.shape[0] if window is None else window[1] - window[0]
         # Gears
-        self.degr_gin, self.degr_labels_gin = self.GearIn.tooth_degr_signal(nolc, statei['GearIn'])
+        self.degr_gin, self.degr_labels_gin = self.GearIn.tooth_degr_signal(nolc, statei['GearIn'], window=window)
         self.degr_labels_gin = ['GearIn %s' % label for label in self.degr_labels_gin]
-        self.degr_gout, self.degr_labels_gout = self.GearOut.tooth_degr_signal(nolc, statei['GearOut'])
+        self.degr_gout, self.degr_labels_gout = self.GearOut.tooth_degr_signal(nolc, statei['GearOut'], window=window)
         self.degr_labels_gout = ['GearOut %s' % label for label in self.degr_labels_gout]
         # Bearings
-        self.degr_b1, self.degr_labels_b1 = np.zeros((self.temp_sample_time.shape[0], 1)), ['Bearing 1 None'] # tbd'
-        self.degr_b2, self.degr_labels_b2 = np.zeros((self.temp_sample_time.shape[0], 1)), ['Bearing 2 None'] # tbd'
-        self.degr_b3, self.degr_labels_b3 = np.zeros((self.temp_sample_time.shape[0], 1)), ['Bearing 3 None'] # tbd'
-        self.degr_b4, self.degr_labels_b4 = np.zeros((self.temp_sample_time.shape[0], 1)), ['Bearing 4 None'] # tbd'
+        self.degr_b1, self.degr_labels_b1 = np.zeros((no_samples, 1)), ['Bearing 1 None'] # tbd'
+        self.degr_b2, self.degr_labels_b2 = np.zeros((no_samples, 1)), ['Bearing 2 None'] # tbd'
+        self.degr_b3, self.degr_labels_b3 = np.zeros((no_samples, 1)), ['Bearing 3 None'] # tbd'
+        self.degr_b4, self.degr_labels_b4 = np.zeros((no_samples, 1)), ['Bearing 4 None'] # tbd'
         # Concatenate all signals
         self.signal_degr = np.concatenate([self.degr_gin, self.degr_gout,
                                      self.degr_b1, self.degr_b2,
@@ -218,65 +278,147 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         # print('--- Execution Time "Init Torque Attributes": %.3f' % (time.time() - start))
         # start = time.time()
 
-        self.GearIn = Gear(self.rotational_frequency_in,
-                           self.GearPropIn,
-                           self.sample_rate, self.temp_sample_time,
-                           self.torque_sample_time,
-                           self.torque_in,
-                           GearDegVibDict=self.GearDegVibDictIn,
-                           seed=self.seed)
-        self.GearOut = Gear(self.rotational_frequency_out,
-                           self.GearPropOut,
-                           self.sample_rate, self.temp_sample_time,
-                           self.torque_sample_time,
-                           self.torque_in, #!!!!!!!!!!!!!!!!!!!!! (Code1234)
-                           GearDegVibDict=self.GearDegVibDictOut,
-                           seed=self.seed)
+        self._init_gears(loads_only=False)
         # print('--- Execution Time "Gears Init": %.3f' % (time.time() - start))
         # start = time.time()
         self.Bearing1 = Bearing(self.rotational_frequency_in,
                                 self.Bearing1Prop,
                                 self.sample_rate, self.temp_sample_time,
-                                self.torque_in)
+                                self.torque_in,
+                                seed=self.seed, name='Bearing1',
+                                window_synthesis=self.synthesize_window)
         self.Bearing2 = Bearing(self.rotational_frequency_in,
                                 self.Bearing2Prop,
                                 self.sample_rate, self.temp_sample_time,
-                                self.torque_in)
+                                self.torque_in,
+                                seed=self.seed, name='Bearing2',
+                                window_synthesis=self.synthesize_window)
         self.Bearing3 = Bearing(self.rotational_frequency_out,
                                 self.Bearing3Prop,
                                 self.sample_rate, self.temp_sample_time,
-                                self.torque_out)
+                                self.torque_out,
+                                seed=self.seed, name='Bearing3',
+                                window_synthesis=self.synthesize_window)
         self.Bearing4 = Bearing(self.rotational_frequency_out,
                                 self.Bearing4Prop,
                                 self.sample_rate, self.temp_sample_time,
-                                self.torque_out)
+                                self.torque_out,
+                                seed=self.seed, name='Bearing4',
+                                window_synthesis=self.synthesize_window)
         # print('--- Execution Time "Bearings Init": %.3f' % (time.time() - start))
 
 
-    def run_vibration(self, nolc, torque, statei=None, output=True):
+    def _init_gears(self, loads_only=False):
+        """
+        Method to initialize both gears (loads_only: only the tooth
+        mesh bounds needed by get_loads, see Gear)
+        """
+        self.GearIn = Gear(self.rotational_frequency_in,
+                           self.GearPropIn,
+                           self.sample_rate, self.temp_sample_time,
+                           self.torque_sample_time,
+                           self.torque_in,
+                           GearDegVibDict=self.GearDegVibDictIn,
+                           seed=self.seed,
+                           synthesis=self.gear_synthesis,
+                           name='GearIn',
+                           window_synthesis=self.synthesize_window,
+                           loads_only=loads_only)
+        self.GearOut = Gear(self.rotational_frequency_out,
+                           self.GearPropOut,
+                           self.sample_rate, self.temp_sample_time,
+                           self.torque_sample_time,
+                           self.torque_in, #!!!!!!!!!!!!!!!!!!!!! (Code1234)
+                           GearDegVibDict=self.GearDegVibDictOut,
+                           seed=self.seed,
+                           synthesis=self.gear_synthesis,
+                           name='GearOut',
+                           window_synthesis=self.synthesize_window,
+                           loads_only=loads_only)
+
+    def init_loads(self, torque):
+        """
+        Method to initialize only what get_loads needs (tooth mesh
+        bounds of both gears) without any signals, e.g. to simulate
+        the degradation only. init_vibration() can follow later.
+        """
+        self.init_torque_attributes(torque)
+        self._init_gears(loads_only=True)
+
+    def signals_initialized(self):
+        """
+        Method to check if all elements are initialized by
+        init_vibration (and not only by init_loads)
+        """
+        return(hasattr(self, 'Bearing1') and not(getattr(self.GearIn, 'loads_only', False)))
+
+    def export_templates(self, min_nbytes=2**16, key=None):
+        """
+        Method to export the initialized gearbox elements to shared
+        memory (arrays of at least min_nbytes, e.g. base_signal,
+        teeth_signal, ids_bounds_torque). Returns a SharedTemplates
+        handle, other processes get this model by handle.attach()
+        without running init_vibration(). The exporting process must
+        call handle.unlink() when done.
+        key: arguments of init_vibration (see SharedTemplates)
+        """
+        assert hasattr(self, 'GearIn'), 'Method init_vibration() must be called before export_templates()'
+        return(SharedTemplates(self, min_nbytes=min_nbytes, key=key))
+
+    def set_rngs(self, nolc):
+        """
+        Method to set the random number generators of all elements
+        and of the random window for the given number of load cycles.
+        Each stream is keyed by (seed, element, nolc), so load cycles
+        can be simulated in any order.
+        """
+        for element in [self.GearIn, self.GearOut,
+                        self.Bearing1, self.Bearing2, self.Bearing3, self.Bearing4]:
+            element.set_rng(self.seed, 'run', nolc)
+        self.rng = get_rng(self.seed, 'Window', 'run', nolc)
+
+    def run_vibration(self, nolc, torque, statei=None, output=True, lean=None, out=None):
         """
         Method to get the raw_signals of all elements, as well as
         the sum.
-        """
+        lean: add the element signals in place to one output column
+        (element signals are not kept), default self.lean
+        out: C-contiguous float64 array with one value per sample of the
+        real sample time (e.g. a row of a memmap), the sum is written to
+        out (in lean mode directly) and out is returned, the model keeps
+        no reference to it
+        """
+        if lean is None:
+            lean = self.lean
+        if out is not None:
+            assert isinstance(out, np.ndarray) and (out.dtype == np.float64) and out.flags.c_contiguous, 'out must be a C-contiguous float64 array'
+            assert out.size == self.real_sample_time.shape[0], 'out must have %i values (samples of sample_interval)' % (self.real_sample_time.shape[0])
         # init torque attributes removed because already in init_vibration
         # self.init_torque_attributes(torque)
-        # seed dependencie on number of load cycles
-        if self.seed is not None:
-            seed = np.random.randint(1, high=2**16, size=1, dtype=np.int32)[0]
-            np.random.seed(seed)
-        else:
-            seed = self.seed
+        # Random number generators depend on seed, element and number of load cycles
+        self.set_rngs(nolc)
+        # Window first: pick random window, synthesize only its samples
+        window = self.get_window_ids() if self.synthesize_window else None
+        # Arguments to render the element signals again (see summary_vibration)
+        self.last_run = (nolc, torque, statei)
+        self.signals_kept = not lean
+        if lean:
+            signal_raw = self.accumulate_signals(nolc, statei, window, out=out)
+            self.signal_raw = signal_raw if out is None else None
+            if output is True:
+                return(signal_raw if out is None else out)
+            return
         # Gear Signals
         # start = time.time()
-        self.signal_gin, self.teeth_signal_gin, self.teeth_no_gin, self.teeth_cid_gin = self.GearIn.raw_signal(seed)
-        self.signal_gout, self.teeth_signal_gout, self.teeth_no_gout, self.teeth_cid_gout = self.GearOut.raw_signal(seed)
+        self.signal_gin, self.teeth_signal_gin, self.teeth_no_gin, self.teeth_cid_gin = self.GearIn.raw_signal(window=window)
+        self.signal_gout, self.teeth_signal_gout, self.teeth_no_gout, self.teeth_cid_gout = self.GearOut.raw_signal(window=window)
         # print('--- Execution Time "Gears Vibration Signal": %.3f' % (time.time() - start))
         # start = time.time()
         # Bearing Signals
-        self.signal_b1, self.ids_b1, self.parts_b1 = self.Bearing1.raw_signal()
-        self.signal_b2, self.ids_b2, self.parts_b2 = self.Bearing2.raw_signal()
-        self.signal_b3, self.ids_b3, self.parts_b3 = self.Bearing3.raw_signal()
-        self.signal_b4, self.ids_b4, self.parts_b4 = self.Bearing4.raw_signal()
+        self.signal_b1, self.ids_b1, self.parts_b1 = self.Bearing1.raw_signal(window=window)
+        self.signal_b2, self.ids_b2, self.parts_b2 = self.Bearing2.raw_signal(window=window)
+        self.signal_b3, self.ids_b3, self.parts_b3 = self.Bearing3.raw_signal(window=window)
+        self.signal_b4, self.ids_b4, self.parts_b4 = self.Bearing4.raw_signal(window=window)
         # print('--- Execution Time "Bearings Vibration Signal": %.3f' % (time.time() - start))
         # start = time.time()
         # Concatenate all signals
@@ -289,24 +431,155 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         # start_2 = start
         # Degradation signals
         if statei is not None:
-            self.get_degr_signal(nolc, statei)
+            self.get_degr_signal(nolc, statei, window=window)
             # Concatenate degr signals
             # print('------ Execution Time "Get Degr Signal": %.3f' % (time.time() - start_2))
             # start_2 = time.time()
             signal_raw = np.concatenate([signal_raw, self.signal_degr],
                                          axis=1)
         # Pick random window to fit real sample time
-        signal_raw = self.trim2realsampletime(signal_raw)
+        if window is None:
+            signal_raw = self.trim2realsampletime(signal_raw)
         # print('------ Execution Time "Trim 2 Real Sample Time": %.3f' % (time.time() - start_2))
         # Accumulate
         self.signal_raw = np.sum(signal_raw, axis=1).reshape(-1, 1)
-        # seed dependencie on number of load cycles
-        if self.seed is not None:
-            np.random.seed(self.seed)
         # print('--- Execution Time "Degradation Vibration Signal": %.3f' % (time.time() - start))
-        if output is True:
+        if out is not None:
+            out.reshape(-1, 1)[...] = self.signal_raw
+            if output is True:
+                return(out)
+        elif output is True:
             return(self.signal_raw)
 
+    def accumulate_signals(self, nolc, statei=None, window=None, out=None, pittings=None):
+        """
+        Method to add the signals of all elements in place to one
+        preallocated column (lean mode of run_vibration). If out is
+        given, the sum is written to out (directly if no trimming
+        to the real sample time is needed).
+        pittings: pitting of all teeth per gear (see get_pittings),
+        used instead of statei
+        """
+        # Accumulate directly in out if it covers all synthesized samples
+        direct = (out is not None) and ((window is not None) or (self.fixed_start is True))
+        if direct:
+            signal_raw = out.reshape(-1, 1)
+            signal_raw[...] = 0
+        elif window is None:
+            signal_raw = np.zeros((self.temp_sample_time.shape[0], 1))
+        else:
+            signal_raw = np.zeros((window[1] - window[0], 1))
+        # Gear Signals (several columns in synthesis 'matrix')
+        for gear in [self.GearIn, self.GearOut]:
+            signal = gear.raw_signal(window=window)[0]
+            self.add_columns(signal_raw, signal)
+        # Bearing Signals
+        for bearing in [self.Bearing1, self.Bearing2, self.Bearing3, self.Bearing4]:
+            bearing.raw_signal(window=window, out=signal_raw)
+        # Degradation signals (bearings tbd)
+        if statei is not None:
+            pittings = self.get_pittings(nolc, statei)
+        if pittings is not None:
+            for gear, key in zip([self.GearIn, self.GearOut], ['GearIn', 'GearOut']):
+                if pittings[key] is not None:
+                    self.add_columns(signal_raw, gear.pitting_degr_signal(pittings[key], window=window, summed=True)[0])
+        # Pick random window to fit real sample time
+        if window is None:
+            signal_raw = self.trim2realsampletime(signal_raw)
+        if (out is not None) and not direct:
+            out.reshape(-1, 1)[...] = signal_raw
+        return(signal_raw)
+
+    def get_pittings(self, nolc, statei):
+        """
+        Method to get the pitting of all teeth of both gears from
+        the given statei (None if gear has no failing teeth)
+        """
+        pittings = {}
+        for key in ['GearIn', 'GearOut']:
+            if statei[key] is None:
+                pittings[key] = None
+            else:
+                pittings[key] = statei[key].loc['$a_{%i}$' % (nolc)].to_numpy(dtype=np.float64)
+        return(pittings)
+
+    def run_vibration_schedule(self, nolcs, pittings, out=None, workers=1, executor='thread'):
+        """
+        Method to render the vibration of each given nolc (lean mode,
+        same random numbers as run_vibration) into one array
+        (steps x samples of sample_interval).
+        pittings: dict GearIn/GearOut of pitting arrays (steps x teeth,
+        nan if tooth is not pitted) or None
+        out: C-contiguous float64 array (steps x samples), else allocated
+        workers: number of threads or processes rendering chunks of
+        nolcs (random numbers are keyed by nolc, same results as 1)
+        executor: 'thread' (copy of the model per thread, arrays are
+        shared) or 'process' (model attached from shared memory)
+        """
+        assert executor in ['thread', 'process'], 'executor must be thread or process'
+        nolcs = np.asarray(nolcs).reshape(-1)
+        shape = (nolcs.size, self.real_sample_time.shape[0])
+        if out is None:
+            out = np.empty(shape)
+        assert isinstance(out, np.ndarray) and (out.dtype == np.float64) and out.flags.c_contiguous, 'out must be a C-contiguous float64 array'
+        assert out.shape == shape, 'out must have shape %s' % (str(shape))
+        workers = min(workers, nolcs.size)
+        if workers > 1:
+            self.render_parallel(nolcs, pittings, out, workers, executor)
+        else:
+            self.render_windows(nolcs, pittings, out)
+        self.signal_raw = None
+        self.signals_kept = False
+        return(out)
+
+    def render_windows(self, nolcs, pittings, out):
+        """
+        Method to render the vibration of each given nolc into
+        the rows of out (see run_vibration_schedule)
+        """
+        for idx, nolc in enumerate(nolcs):
+            self.set_rngs(nolc)
+            window = self.get_window_ids() if self.synthesize_window else None
+            pittings_i = {key: (None if value is None else value[idx, :]) for key, value in pittings.items()}
+            self.accumulate_signals(nolc, window=window, out=out[idx, :], pittings=pittings_i)
+
+    def render_parallel(self, nolcs, pittings, out, workers, executor):
+        """
+        Method to render chunks of the given nolcs on a thread
+        or process pool (see run_vibration_schedule)
+        """
+        # Some chunks per worker to balance the load
+        chunks = np.array_split(np.arange(nolcs.size), min(nolcs.size, 4*workers))
+        def get_pittings(chunk):
+            return({key: (None if value is None else value[chunk[0]:chunk[-1]+1, :]) for key, value in pittings.items()})
+        if executor == 'thread':
+            # One model per thread, rows of out are written directly
+            def render_all(worker):
+                model = copy_sharing_arrays(self)
+                for chunk in chunks[worker::workers]:
+                    model.render_windows(nolcs[chunk], get_pittings(chunk), out[chunk[0]:chunk[-1]+1, :])
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(render_all, range(workers)))
+        else:
+            templates = self.export_templates()
+            try:
+                with multiprocessing.get_context().Pool(processes=workers, initializer=init_render_worker,
+                                                        initargs=(templates, )) as pool:
+                    tasks = [(chunk[0], nolcs[chunk], get_pittings(chunk)) for chunk in chunks]
+                    for start, signals in pool.imap_unordered(render_chunk, tasks):
+                        out[start:start+signals.shape[0], :] = signals
+            finally:
+                templates.unlink()
+
+    def add_columns(self, out, signal):
+        """
+        Method to add the sum of all columns of signal in place
+        to the column array out
+        """
+        if signal.shape[1] == 1:
+            out += signal
+        else:
+            out += np.sum(signal, axis=1, keepdims=True)
 
     def plot_signal(self, signal, legend, title):
         """
@@ -314,7 +587,11 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         """
         fig = plt.figure(figsize=[15, 5])
         plt.title(title)
-        plt.plot(self.temp_sample_time, signal);
+        if signal.shape[0] != self.temp_sample_time.shape[0]:
+            # Only the window has been synthesized (see window_synthesis)
+            plt.plot(self.temp_sample_time[self.start_id:self.stop_id], signal);
+        else:
+            plt.plot(self.temp_sample_time, signal);
         if self.fixed_start is not True:
             plt.axvspan(self.temp_sample_time[self.start_id],
                         self.temp_sample_time[self.stop_id],
@@ -390,6 +667,10 @@ class Gearbox_Vibration(Gear, Bearing, BasicHelper):
         """
         Method to plot all element signals
         """
+        if not self.signals_kept:
+            # Lean run: render the element signals of the last run again
+            # (same random numbers, see set_rngs)
+            self.run_vibration(*self.last_run, output=False, lean=False)
         # Plot Accumulation
         display(HTML('<h3>Controls</h3>'))
         self.plot_controls()
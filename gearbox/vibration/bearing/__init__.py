@@ -4,7 +4,8 @@
 import os
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
@@ -27,9 +28,13 @@ from gearbox.vibration.helper import BasicHelper
 class Bearing(BasicHelper, SignalHelper, StationarySignals):
 
     def __init__(self, rotational_frequency, bearingdict,
-                 sample_rate, time, torque):
+                 sample_rate, time, torque, seed=None, name='Bearing',
+                 window_synthesis=False):
         """
         Class constructor.
+        name: element name, used as key of the random number generator
+        window_synthesis: if True, the master signal for raw_signal(window)
+        is calculated at initialization (see init_window_signal)
         """
         BasicHelper.__init__(self)
         SignalHelper.__init__(self)
@@ -39,7 +44,13 @@ class Bearing(BasicHelper, SignalHelper, StationarySignals):
         self.sample_rate = sample_rate
         self.time = time
         self.torque = torque
+        self.seed = seed
+        self.name = name
+        self.set_rng(seed, 'init')
+        self.window_synthesis = window_synthesis
         self.interpret_dict()
+        if self.window_synthesis:
+            self.init_window_signal()
 
 
     def interpret_dict(self):
@@ -158,12 +169,40 @@ class Bearing(BasicHelper, SignalHelper, StationarySignals):
                 self.exponent['%s' % (part)] = None
 
 
-    def raw_signal(self):
+    def init_window_signal(self):
+        """
+        Method to initialize the master signal for window synthesis:
+        one column per part and harmonic (signal model scaled by the
+        harmonic factor, without random amplitude and noise) over the
+        full sample time.
+        """
+        window_signal = []
+        for part in ['iring', 'relement', 'oring']:
+            for idh, harmonic in enumerate(self.harmonics['%s' % (part)]):
+                signal_i = self.signal_model['%s' % (part)].run(self.time,
+                                                                self.rotational_frequency['%s' % (part)] * harmonic,
+                                                                ampl=1)
+                window_signal.append(signal_i.reshape(-1, 1) * self.harmonics_fac['%s' % (part)][idh])
+        self.window_signal = np.concatenate(window_signal, axis=1)
+
+    def raw_signal(self, window=None, out=None):
         """
         Method to return the raw signal simulated by the given gear.
+        Random values are drawn from self.rng (see set_rng).
+        window: (start_id, stop_id), only the samples of this window
+        are synthesized from the master signal (see init_window_signal)
+        out: column array, the signal of each part and harmonic is added
+        in place (no signal matrix) and out is returned instead
         """
+        if window is None:
+            start_id, stop_id = 0, self.time.shape[0]
+        else:
+            assert hasattr(self, 'window_signal'), 'Bearing must be initialized with window_synthesis=True'
+            start_id, stop_id = window
+        no_samples = stop_id - start_id
         # Get Gear relevant parameters
-        signal = np.zeros((self.time.shape[0], 1))
+        signal = np.zeros((no_samples, 1))
+        column = 0
         # i and ids are used to save the id of the first signal of each element
         i = 0
         ids = []
@@ -174,37 +213,47 @@ class Bearing(BasicHelper, SignalHelper, StationarySignals):
                     labels[idp] = labels[idp] + ': Harmonic no %i' % (harmonic)
                     ids.append(i)
                     i += 1
-                # Get signal for part i
-                signal_i = self.signal_model['%s' % (part)].run(self.time,
-                                                                self.rotational_frequency['%s' % (part)] * harmonic,
-                                                                ampl=1)
-                # Scale by given harmonic factor
-                signal_i = signal_i * self.harmonics_fac['%s' % (part)][idh]
+                if window is None:
+                    # Get signal for part i
+                    signal_i = self.signal_model['%s' % (part)].run(self.time,
+                                                                    self.rotational_frequency['%s' % (part)] * harmonic,
+                                                                    ampl=1)
+                    # Scale by given harmonic factor
+                    signal_i = signal_i * self.harmonics_fac['%s' % (part)][idh]
+                else:
+                    # Window of master signal (already scaled by harmonic factor)
+                    signal_i = self.window_signal[start_id:stop_id, column:column+1]
+                column += 1
                 # Add Amplitude
                 amplitude_vector = self.create_amplitude_vector(method=self.ampl_method['%s' % (part)],
                                                                 mu=self.mu['%s' % (part)],
                                                                 sigma=self.sigma['%s' % (part)],
                                                                 constant=self.constant['%s' % (part)],
-                                                                no_values=self.time.shape[0],
-                                                                repeat2no_values=self.time.shape[0])
+                                                                no_values=no_samples,
+                                                                repeat2no_values=no_samples)
                 signal_i = signal_i * amplitude_vector.reshape(-1, 1)
                 # Add Torque Influence
-                scale_vector = self.create_scale_vector(array=self.torque, method=self.torq_method['%s' % (part)],
-                                                        scale_min=self.scale_min['%s' % (part)], scale_max=self.scale_max['%s' % (part)],
-                                                        value_min=self.value_min['%s' % (part)], value_max=self.value_max['%s' % (part)],
-                                                        exponent=self.exponent['%s' % (part)],
-                                                        norm_divisor=self.norm_divisor['%s' % (part)])
+                scale_vector = self.create_scale_vector_cached(array=self.torque, method=self.torq_method['%s' % (part)],
+                                                               scale_min=self.scale_min['%s' % (part)], scale_max=self.scale_max['%s' % (part)],
+                                                               value_min=self.value_min['%s' % (part)], value_max=self.value_max['%s' % (part)],
+                                                               exponent=self.exponent['%s' % (part)],
+                                                               norm_divisor=self.norm_divisor['%s' % (part)])
                 # Resize for Case: If scale_vector.size is greater than signal.size (due to larger torque)
-                scale_vector = scale_vector[0:signal_i.size]
+                scale_vector = scale_vector[start_id:start_id+signal_i.size]
                 signal_i = signal_i * scale_vector.reshape(-1, 1)
                 # Add noise
                 noise_vector = self.create_amplitude_vector(method=self.noise_method['%s' % (part)],
                                                             mu=self.noise_mu['%s' % (part)],
                                                             sigma=self.noise_sigma['%s' % (part)],
-                                                            no_values=self.time.shape[0])
+                                                            no_values=no_samples)
                 signal_i = signal_i + noise_vector.reshape(-1, 1)
-                signal = np.concatenate([signal, signal_i], axis=1)
+                if out is not None:
+                    out += signal_i
+                else:
+                    signal = np.concatenate([signal, signal_i], axis=1)
                 # Get new shift arguments
+        if out is not None:
+            return(out, ids, labels)
         # Remove first zero axis
         signal = np.delete(signal, 0, 1)
         return(signal, ids, labels)
@@ -4,13 +4,15 @@
 import os
 from copy import deepcopy as dc
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 # import time
 
 # import 3rd party libarys
 import numpy as np
 import pandas as pd
 # from matplotlib import pyplot as plt
+# from scipy.signal import oaconvolve
 # from scipy.signal import gausspulse
 # from sklearn.preprocessing import MinMaxScaler
 # from scipy.stats import norm
@@ -19,21 +21,37 @@ import pandas as pd
 # from sklearn.metrics import mean_squared_error
 
 # import local libarys
+from gearbox.lazy import LazyModule
 from gearbox.vibration.helper import NonstationarySignals
 from gearbox.vibration.helper import SignalHelper
 from gearbox.vibration.helper import BasicHelper
+from gearbox.vibration.helper import ToothLoads
+
+# scipy.signal is imported on first use (see gearbox.lazy)
+scipy_signal = LazyModule('scipy.signal')
 
 ####################################################
 #------------------- ELEMENTS ---------------------#
 
 class Gear(BasicHelper, SignalHelper, NonstationarySignals):
 
+    synthesis_list = ['matrix', 'overlap_add']
+
     def __init__(self, rotational_frequency, geardict,
                  sample_rate, sample_time, torque_sample_time,
                  torque, GearDegVibDict=None,
-                 seed=None):
+                 seed=None, synthesis='matrix', name='Gear',
+                 window_synthesis=False, loads_only=False):
         """
         Class constructor.
+        name: element name, used as key of the random number generator
+        synthesis: 'matrix' (one signal column per tooth mesh) or
+        'overlap_add' (sum of all tooth meshes as one column, calculated
+        by convolution of the tooth pulse with an impulse train)
+        window_synthesis: if True, the master signal for raw_signal(window)
+        is calculated at initialization (see init_window_signal)
+        loads_only: if True, only the tooth mesh bounds needed by
+        load_per_tooth are initialized (no signals, see init_tooth_meshes)
         """
         BasicHelper.__init__(self)
         SignalHelper.__init__(self)
@@ -48,9 +66,19 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
         self.teeth_no_list = None
         self.teeth_cid_list = None
         self.seed = seed
+        self.name = name
+        # Random number generator for initialization
+        self.set_rng(seed, 'init')
+        assert synthesis in self.synthesis_list, 'synthesis must be one of the following: %s' % (str(self.synthesis_list))
+        self.synthesis = synthesis
+        self.window_synthesis = window_synthesis
+        self.loads_only = loads_only
         self.interpret_dict()
         self.interpret_deg_dict()
         self.get_plus_minus_harmonics_oddeven()
+        if loads_only:
+            self.init_tooth_meshes()
+            return
         self.init_gear()
 #         self.get_ids2tooth()
         self.init_degr_signal()
@@ -196,15 +224,10 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
         """
         plus_minus_harmonics = []
         for i, harmonic in enumerate(self.harmonics):
-            if self.seed is not None:
-                np.random.seed(np.random.randint(1, high=2**16, size=1, dtype=np.int32)[0])
-            if np.random.randn(1)>0:
+            if self.rng.standard_normal(1)>0:
                 plus_minus_harmonics.append(-1)
             else:
                 plus_minus_harmonics.append(1)
-        # seed dependencie on number of load cycles
-        if self.seed is not None:
-            np.random.seed(self.seed)
         self.plus_minus_harmonics = plus_minus_harmonics
 
     def get_plus_minus_harmonics_oddeven(self):
@@ -220,9 +243,11 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
                 plus_minus_harmonics.append(1)
         self.plus_minus_harmonics = plus_minus_harmonics
 
-    def init_gear(self):
+    def init_tooth_meshes(self):
         """
-        Method to initialize the raw signal simulated by the given gear.
+        Method to initialize the single tooth signal and the bounds
+        of each tooth mesh within the torque sample time (all needed
+        by load_per_tooth). Returns tooth signal and tooth center.
         """
         # Get Gear relevant parameters
         time2tooth = (1 / self.rotational_frequency) / self.no_teeth
@@ -243,6 +268,19 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
         # Get ids bounds
         # self.ids_bounds = self.get_ids_bounds(self.sample_time)
         self.ids_bounds_torque = self.get_ids_bounds(self.torque_sample_time)
+        # Get teeth list of the torque sample time
+        teeth_numbering = np.arange(1, self.no_teeth+0.1, 1, dtype=np.int32)
+        self.teeth_no_list_torque = self.repeat2no_values(teeth_numbering,
+                                                          no_values=np.shape(self.ids_bounds_torque)[0])
+        self.init_load_per_tooth()
+        return(tooth_signal, tooth_center)
+
+    def init_gear(self):
+        """
+        Method to initialize the raw signal simulated by the given gear.
+        """
+        tooth_signal, tooth_center = self.init_tooth_meshes()
+        time2tooth = self.time2tooth
         # Shift signal for each tooth
         teeth_signal, teeth_cid_list = self.shift_signal(signal=tooth_signal,
                                                          signal_center=tooth_center,
@@ -253,24 +291,86 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
         teeth_numbering = np.arange(1, self.no_teeth+0.1, 1, dtype=np.int32)
         teeth_no_list = self.repeat2no_values(teeth_numbering,
                                               no_values=teeth_signal.shape[1])
-        teeth_no_list_torque = self.repeat2no_values(teeth_numbering,
-                                                     no_values=np.shape(self.ids_bounds_torque)[0])
-        signal = np.zeros(teeth_signal.shape)
+        self.teeth_signal = teeth_signal
+        self.teeth_no_list = teeth_no_list
+        self.teeth_cid_list = teeth_cid_list
+        if self.synthesis == 'matrix':
+            self.base_signal = self.get_base_signal()
+        else:
+            # Matrix is not needed, keep non zero part of the tooth pulse
+            self.base_signal = None
+            nonzero_ids = np.flatnonzero(teeth_signal.signal)
+            self.tooth_pulse = teeth_signal.signal[nonzero_ids[0]:nonzero_ids[-1]+1]
+            self.tooth_pulse_offset = tooth_center - nonzero_ids[0]
+        if self.window_synthesis:
+            self.init_window_signal()
+
+    def init_window_signal(self):
+        """
+        Method to initialize the master signal for window synthesis:
+        one column per amplitude group (all tooth meshes multiplied by
+        the same value of the amplitude vector) over the full sample
+        time, the sum of the base signal columns of this group.
+        """
+        no_meshes = len(self.teeth_cid_list)
+        # Length of the amplitude vector before repeating it to all meshes
+        if self.ampl_method == 'const_repeat':
+            self.no_amplitude_groups = len(self.constant)
+        else:
+            self.no_amplitude_groups = self.no_teeth
+        groups = np.arange(0, no_meshes, 1) % self.no_amplitude_groups
+        window_signal = np.zeros((self.sample_time.shape[0], self.no_amplitude_groups))
+        for group in range(0, self.no_amplitude_groups):
+            if self.synthesis == 'matrix':
+                window_signal[:, group] = np.sum(self.base_signal[:, groups == group], axis=1)
+            else:
+                weights = (groups == group).astype(np.float64)
+                window_signal[:, group] = self.get_overlap_add_signal(weights).reshape(-1)
+        self.window_signal = window_signal
+
+    def get_harmonics_signal(self, teeth_signal_rows):
+        """
+        Method to add the harmonics to a teeth signal. The given
+        function teeth_signal_rows(row_ids) must return the rows
+        of the teeth signal.
+        harmonic i equals np.tile(teeth_signal, [harmonic, 1])[::harmonic, :]
+        """
+        sample_ids = np.arange(0, self.sample_time.shape[0], 1)
         for i, harmonic in enumerate(self.harmonics):
-            signal_harmonic_i = np.tile(teeth_signal, [harmonic, 1])
-            #signal_harmonic_i = signal_harmonic_i / len(self.harmonics)
-            signal_harmonic_i = signal_harmonic_i[::harmonic, :]
+            signal_harmonic_i = teeth_signal_rows((sample_ids * harmonic) % sample_ids.size)
             # Assign pos or neg sign to harmonic_i based on plus_minus_harmoncis
             signal_harmonic_i = signal_harmonic_i * self.plus_minus_harmonics[i]
             signal_harmonic_i = signal_harmonic_i * self.harmonics_fac[i]
-            signal += signal_harmonic_i
+            if i == 0:
+                signal = signal_harmonic_i
+            else:
+                signal += signal_harmonic_i
         # Norm by number of harmonics
         signal = signal / len(self.harmonics)
-        self.base_signal = signal
-        self.teeth_signal = teeth_signal
-        self.teeth_no_list = teeth_no_list
-        self.teeth_no_list_torque = teeth_no_list_torque
-        self.teeth_cid_list = teeth_cid_list
+        return(signal)
+
+    def get_base_signal(self):
+        """
+        Method to get the base signal matrix (one column per
+        tooth mesh) including harmonics.
+        """
+        return(self.get_harmonics_signal(self.teeth_signal.gather))
+
+    def get_overlap_add_signal(self, weights):
+        """
+        Method to get the sum of all columns of the base signal
+        weighted by given weights (one per tooth mesh) without
+        creating the base signal matrix. The sum of the weighted
+        teeth signals equals an impulse train (impulse at each tooth
+        mesh center id) convolved with the tooth pulse (FFT overlap-add).
+        """
+        no_samples = self.sample_time.shape[0]
+        impulses = np.zeros(no_samples)
+        np.add.at(impulses, np.array(self.teeth_cid_list), weights)
+        teeth_sum = scipy_signal.oaconvolve(impulses, self.tooth_pulse)
+        teeth_sum = teeth_sum[self.tooth_pulse_offset:self.tooth_pulse_offset+no_samples]
+        signal = self.get_harmonics_signal(lambda row_ids: teeth_sum[row_ids])
+        return(signal.reshape(-1, 1))
 
     # def get_ids2tooth(self):
     #     """
@@ -285,25 +385,34 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
     #     self.ids2tooth = dist_ids
 
 
-    def raw_signal(self, seed=None):
+    def raw_signal(self, window=None):
         """
         Method to return the raw signal simulated by the given gear.
+        Random values are drawn from self.rng (see set_rng).
+        window: (start_id, stop_id), only the samples of this window
+        are synthesized (see raw_signal_window)
         """
-        self.seed = seed
-        base_signal = self.base_signal
+        if window is not None:
+            return(self.raw_signal_window(*window))
+        no_meshes = len(self.teeth_cid_list)
         # Add Amplitude
         amplitude_vector = self.create_amplitude_vector(method=self.ampl_method,
                                                         mu=self.mu, sigma=self.sigma,
                                                         constant=self.constant,
                                                         no_values=self.no_teeth,
-                                                        repeat2no_values=base_signal.shape[1])
-        base_signal = base_signal * amplitude_vector
+                                                        repeat2no_values=no_meshes)
+        if self.synthesis == 'matrix':
+            base_signal = self.base_signal * amplitude_vector
+        else:
+            # Sum over all tooth meshes (columns) of base_signal * amplitude_vector
+            weights = np.broadcast_to(amplitude_vector.reshape(-1), (no_meshes,))
+            base_signal = self.get_overlap_add_signal(weights)
         # Add Torque Influence
-        scale_vector = self.create_scale_vector(array=self.torque, method=self.torq_method,
-                                                scale_min=self.scale_min, scale_max=self.scale_max,
-                                                value_min=self.value_min, value_max=self.value_max,
-                                                exponent=self.exponent,
-                                                norm_divisor=self.norm_divisor)
+        scale_vector = self.create_scale_vector_cached(array=self.torque, method=self.torq_method,
+                                                       scale_min=self.scale_min, scale_max=self.scale_max,
+                                                       value_min=self.value_min, value_max=self.value_max,
+                                                       exponent=self.exponent,
+                                                       norm_divisor=self.norm_divisor)
         # Resize for Case: If scale_vector.size is greater than signal.size (due to larger torque)
         scale_vector = scale_vector[0:base_signal.shape[0], :]
         base_signal = base_signal * scale_vector
@@ -312,7 +421,43 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
                                                     mu=self.noise_mu,
                                                     sigma=self.noise_sigma,
                                                     no_values=self.sample_time.shape[0])
-        base_signal = base_signal + noise_vector.reshape(-1, 1)
+        if self.synthesis == 'matrix':
+            base_signal = base_signal + noise_vector.reshape(-1, 1)
+        else:
+            # Noise is added to each tooth mesh column in 'matrix'
+            base_signal = base_signal + no_meshes * noise_vector.reshape(-1, 1)
+        return(base_signal, self.teeth_signal, self.teeth_no_list, self.teeth_cid_list)
+
+    def raw_signal_window(self, start_id, stop_id):
+        """
+        Method to return the raw signal of the samples start_id to
+        stop_id of the full sample time (sum of all tooth meshes as in
+        'overlap_add'), taken from the master signal (see
+        init_window_signal). Random noise is only drawn for the samples
+        of the window.
+        """
+        assert hasattr(self, 'window_signal'), 'Gear must be initialized with window_synthesis=True'
+        no_meshes = len(self.teeth_cid_list)
+        # Add Amplitude (one value per amplitude group)
+        amplitude_vector = self.create_amplitude_vector(method=self.ampl_method,
+                                                        mu=self.mu, sigma=self.sigma,
+                                                        constant=self.constant,
+                                                        no_values=self.no_teeth,
+                                                        repeat2no_values=self.no_amplitude_groups)
+        base_signal = np.dot(self.window_signal[start_id:stop_id, :], amplitude_vector.reshape(-1, 1))
+        # Add Torque Influence
+        scale_vector = self.create_scale_vector_cached(array=self.torque, method=self.torq_method,
+                                                       scale_min=self.scale_min, scale_max=self.scale_max,
+                                                       value_min=self.value_min, value_max=self.value_max,
+                                                       exponent=self.exponent,
+                                                       norm_divisor=self.norm_divisor)
+        base_signal = base_signal * scale_vector[start_id:stop_id, :]
+        # Add noise (to each tooth mesh as in 'matrix')
+        noise_vector = self.create_amplitude_vector(method=self.noise_method,
+                                                    mu=self.noise_mu,
+                                                    sigma=self.noise_sigma,
+                                                    no_values=stop_id-start_id)
+        base_signal = base_signal + no_meshes * noise_vector.reshape(-1, 1)
         return(base_signal, self.teeth_signal, self.teeth_no_list, self.teeth_cid_list)
 
     def get_ids_bounds(self, time):
@@ -358,108 +503,160 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
         # Add arguments
         return(ids_bounds)
 
+    def init_load_per_tooth(self):
+        """
+        Method to get the neccessary values for method load_per_tooth()
+        at initialization: reduceat ids of the bounds and the position
+        of each tooth mesh in the teeth x meshes load array
+        """
+        # Clip bounds to torque length
+        low_ids = np.maximum(self.ids_bounds_torque[:, 0], 0).astype(np.int64)
+        up_ids = np.minimum(self.ids_bounds_torque[:, 1], self.torque_sample_time.shape[0]).astype(np.int64)
+        self.load_no_ids = up_ids - low_ids
+        # Alternating low and up ids, every second sum is the one of interest
+        self.load_reduce_ids = np.stack([low_ids, up_ids], axis=1).reshape(-1)
+        # Row (tooth) and column (mesh of this tooth) of each tooth mesh
+        teeth = np.asarray(self.teeth_no_list_torque, dtype=np.int64).reshape(-1)
+        self.load_rows = teeth - 1
+        self.load_counts = np.bincount(self.load_rows, minlength=self.no_teeth)
+        order = np.argsort(self.load_rows, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(self.load_counts)[:-1]])
+        self.load_cols = np.empty_like(self.load_rows)
+        self.load_cols[order] = np.arange(order.size) - np.repeat(starts, self.load_counts)
+
     def load_per_tooth(self, torque):
         """
         Method to determine an aquivalent load for each tooth.
-        Returns a dictionary containing a list of mean loads
-        per tooth. E.g.
+        Returns a ToothLoads object containing the mean loads
+        as teeth x meshes array (attribute array), which can be
+        used as dictionary as well. E.g.
         '1': [155, 177, 169,....]
         '2': [196, 155, 169,....]
         '3' ...
         ....
         """
-        # Dict tooth no
-        load_dict = {str(idx+1): [] for idx in range(self.no_teeth)}
-        # Iterate over torque and get mean value of load per tooth and load cycle
-        for idx, id_low_up in enumerate(self.ids_bounds_torque):
-            low_id = max([0, id_low_up[0]])
-            up_id = min([self.torque_sample_time.shape[0], id_low_up[1]])
-            load_dict[str(self.teeth_no_list_torque[idx])].append(np.mean(torque[low_id:up_id]))
-        return(load_dict)
-
+        torque = np.asarray(torque, dtype=np.float64).reshape(-1)
+        # Append zero so that the upper bound is a valid reduceat id
+        sums = np.add.reduceat(np.append(torque, 0), self.load_reduce_ids)[0::2]
+        # Mean value of load per tooth and load cycle (nan for empty bounds as np.mean)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(self.load_no_ids > 0, sums / self.load_no_ids, np.nan)
+        # Teeth x meshes array
+        loads = np.full((self.no_teeth, self.load_counts.max()), np.nan)
+        loads[self.load_rows, self.load_cols] = means
+        return(ToothLoads(loads, self.load_counts))
 
     def init_degr_signal(self):
         """
         Method to initialize the degradation raw signal simulated
-        by the given gear.
+        by the given gear. Each tooth mesh adds one impulse (single
+        peak) to the signal of the meshing tooth, only sample id
+        and tooth number of each impulse are stored.
         """
         #---------------------
-        # Get single tooth signal with amplitude=1
-        # Placeholer
-        teeth_signal = {'%i' % (tooth_i): [] for tooth_i in range(1, self.no_teeth+1, 1)}
+        impulse_ids = []
+        impulse_teeth = []
         # Start to loop over id bounds all teeth
         tooth_curr = 1
+        offset = 0
         for idx, id_low_up in enumerate(self.ids_bounds):
             # Get current number of ids assigned to one tooth
             diff = id_low_up[1] - id_low_up[0]
             # Get weights by normal distribution
             # weights: Get absolute sorted normal random numbers --> eg. [0.1, 0.3, 0.8, 0.5, 0.2]
-            randn_weights = 1/np.abs(np.sort(np.random.randn(diff)))
+            randn_weights = 1/np.abs(np.sort(self.rng.standard_normal(diff)))
             # weights: Norm to one
             randn_weights = randn_weights / sum(randn_weights)
-            # Create zero array
-            tooth_signal_i = np.zeros(diff)
             # Choose one value as one, regarding given weights
-            tooth_signal_i[np.random.choice(np.arange(0, diff), p=randn_weights)] = 1
-            # Iterate over all tooth and add current fraction to eachs tooth
-            # dictionary: 0s if tooth_i is not current tooth
-            for tooth_i in range(1, self.no_teeth+1, 1):
-                if tooth_i==tooth_curr:
-                    teeth_signal['%i' % (tooth_i)].extend(tooth_signal_i)
-                else:
-                    teeth_signal['%i' % (tooth_i)].extend(np.zeros(diff))
+            impulse_id = self.rng.choice(np.arange(0, diff), p=randn_weights)
+            # Impulse only if tooth_curr is a tooth of the gear
+            if tooth_curr <= self.no_teeth:
+                impulse_ids.append(offset + impulse_id)
+                impulse_teeth.append(tooth_curr)
+            offset += diff
             # Set current tooth for next loop
             if tooth_curr==self.no_teeth+1:
                 tooth_curr = 1
             else:
                 tooth_curr += 1
-        # Change to numpy
-        #teeth_signal = np.array(teeth_signal).reshape(-1, 1)
         # Crop if given id exceeds bounds
         lower_crop = np.abs(self.ids_bounds[0, 0])
         upper_crop = min(self.sample_time.shape[0] - np.abs(self.ids_bounds[-1, 1]), -1)
-        for tooth_i in range(1, self.no_teeth+1, 1):
-            del(teeth_signal['%i' % (tooth_i)][:lower_crop])
-            del(teeth_signal['%i' % (tooth_i)][upper_crop:])
-        self.teeth_degr_signal = teeth_signal
+        no_samples = max(0, max(0, offset - lower_crop) + upper_crop)
+        impulse_ids = np.array(impulse_ids, dtype=np.int64) - lower_crop
+        impulse_teeth = np.array(impulse_teeth, dtype=np.int64)
+        valid = np.logical_and(impulse_ids >= 0, impulse_ids < no_samples)
+        self.degr_impulse_ids = impulse_ids[valid]
+        self.degr_impulse_teeth = impulse_teeth[valid]
+        self.degr_no_samples = no_samples
 
+    def get_teeth_degr_signal(self, teeth, amplitudes=None, window=None, summed=False):
+        """
+        Method to render the degradation signal of the given teeth
+        (tooth numbers starting with 1) as matrix with one column per
+        tooth. The impulses of each tooth are scattered with the
+        given amplitude (default 1).
+        window: (start_id, stop_id), only these samples are rendered
+        summed: if True, all teeth are rendered into one column
+        """
+        teeth = np.array(teeth, dtype=np.int64).reshape(-1)
+        if amplitudes is None:
+            amplitudes = np.ones(teeth.size)
+        amplitudes = np.array(amplitudes, dtype=np.float64).reshape(-1)
+        start_id, stop_id = (0, self.degr_no_samples) if window is None else window
+        # Column of each impulse (-1 if tooth is not given or impulse is outside the window)
+        tooth2column = np.full(self.no_teeth+1, -1)
+        tooth2column[teeth] = np.arange(0, teeth.size, 1)
+        columns = tooth2column[self.degr_impulse_teeth]
+        given = (columns >= 0) & (self.degr_impulse_ids >= start_id) & (self.degr_impulse_ids < stop_id)
+        if summed:
+            # One weighted scatter-add over all impulses of the given teeth
+            signal = np.bincount(self.degr_impulse_ids[given] - start_id,
+                                 weights=amplitudes[columns[given]],
+                                 minlength=stop_id - start_id).reshape(-1, 1)
+            return(signal)
+        signal = np.zeros((stop_id - start_id, teeth.size))
+        signal[self.degr_impulse_ids[given] - start_id, columns[given]] = amplitudes[columns[given]]
+        return(signal)
 
-    def tooth_degr_signal(self, nolc, statei):
+    def tooth_degr_signal(self, nolc, statei, window=None):
         """
         Method to get a degradation signal based on
         given tooth state i.
         Method raw_signal must been run before.
+        window: (start_id, stop_id), only these samples are synthesized
         """
         if statei is not None:
+            # Pitting of all teeth (nan if tooth is not pitted)
+            pitting_all = statei.loc['$a_{%i}$' % (nolc)].to_numpy(dtype=np.float64)
+        else:
+            pitting_all = None
+        return(self.pitting_degr_signal(pitting_all, window=window))
+
+    def pitting_degr_signal(self, pitting_all, window=None, summed=False):
+        """
+        Method to get a degradation signal based on the given
+        pitting of all teeth (array, nan if tooth is not pitted,
+        None if gear has no failing teeth).
+        window: (start_id, stop_id), only these samples are synthesized
+        summed: if True, the sum of all tooth columns is returned
+        as one column
+        """
+        start_id, stop_id = (0, self.sample_time.shape[0]) if window is None else window
+        if pitting_all is not None:
             #---------------------
-            # Iterate over pitting (ordered by tooth number)
-            pittings = []
-            labels = []
-            signal = np.zeros((self.sample_time.shape[0], 1))
-            for tooth, pitting in enumerate(statei.loc['$a_{%i}$' % (nolc)]):
-                # if no pitting @ tooth
-                if np.isnan(pitting):
-                    pass
-                # else pitting @ tooth
-                else:
-                    # Condition on tooth to filter for itself tooth mesh
-                    tooth_signal = self.teeth_degr_signal['%i' % (tooth+1)]
-                    # Formatting
-                    tooth_signal = np.array(tooth_signal).reshape(-1,1)
-                    pittings.append(pitting)
-                    labels.append('Tooth %i (a = %.3f)' % (tooth+1, pitting))
-                    # Add signal_i to signal
-                    signal = np.concatenate([signal, tooth_signal], axis=1)
+            # Pitting (ordered by tooth number)
+            teeth = np.flatnonzero(~np.isnan(pitting_all)) + 1
+            pittings = pitting_all[teeth-1]
+            labels = ['Tooth %i (a = %.3f)' % (tooth, pitting) for tooth, pitting in zip(teeth, pittings)]
             #---------------------
             # Set degradation signal to zero signal if no pitting occurs
-            if signal.shape[1] == 1:
+            if teeth.size == 0:
                 labels = ['None']
-                degr_signal = signal
+                degr_signal = np.zeros((stop_id - start_id, 1))
             else:
-                # Delete dummy entry
-                signal = np.delete(signal, 0, 1)
                 # Scale Pitting
-                scaled_pittings = self.create_scale_vector(array=np.array(pittings),
+                scaled_pittings = self.create_scale_vector(array=pittings,
                                                            method=self.GearDegVibDict['scale_method'],
                                                            ones_base=False,
                                                            scale_min=self.GearDegVibDict['scale_attributes']['scale_min'],
@@ -468,32 +665,29 @@ class Gear(BasicHelper, SignalHelper, NonstationarySignals):
                                                            value_max=self.GearDegVibDict['scale_attributes']['value_max'],
                                                            exponent=self.GearDegVibDict['scale_attributes']['exponent'],
                                                            norm_divisor=1)
-                pittings = scaled_pittings.reshape(-1).tolist()
-                # Add Amplitude
-                amplitude_vector = self.create_amplitude_vector(method='const_repeat',
-                                                                mu=None, sigma=None,
-                                                                constant=pittings,
-                                                                no_values=None,
-                                                                repeat2no_values=signal.shape[1])
-                degr_signal = signal * amplitude_vector
+                # Impulses of each tooth with amplitude of scaled pitting
+                degr_signal = self.get_teeth_degr_signal(teeth, amplitudes=scaled_pittings, window=window, summed=summed)
                 # Add Torque Influence
                 if self.GearDegVibDict['torq_influence']:
-                    scale_vector = self.create_scale_vector(array=self.torque, method=self.torq_method,
-                                                            scale_min=self.scale_min, scale_max=self.scale_max,
-                                                            value_min=self.value_min, value_max=self.value_max,
-                                                            exponent=self.exponent,
-                                                            norm_divisor=self.norm_divisor)
+                    scale_vector = self.create_scale_vector_cached(array=self.torque, method=self.torq_method,
+                                                                   scale_min=self.scale_min, scale_max=self.scale_max,
+                                                                   value_min=self.value_min, value_max=self.value_max,
+                                                                   exponent=self.exponent,
+                                                                   norm_divisor=self.norm_divisor)
                     # Resize for Case: If scale_vector.size is greater than signal.size (due to larger torque)
-                    scale_vector = scale_vector[0:degr_signal.shape[0], :]
+                    scale_vector = scale_vector[start_id:start_id+degr_signal.shape[0], :]
                     degr_signal = degr_signal * (scale_vector / 2)
                 # Add noise
                 noise_vector = self.create_amplitude_vector(method=self.GearDegVibDict['noise_method'],
                                                             mu=self.GearDegVibDict['noise_attributes']['mu'],
                                                             sigma=self.GearDegVibDict['noise_attributes']['sigma'],
-                                                            no_values=self.sample_time.shape[0])
+                                                            no_values=stop_id-start_id)
+                # Noise is added to each tooth column
+                if summed:
+                    noise_vector = noise_vector * teeth.size
                 degr_signal = degr_signal + noise_vector.reshape(-1, 1)
             return(degr_signal, labels)
         else:
-            degr_signal = np.zeros(self.sample_time.shape)
+            degr_signal = np.zeros((stop_id - start_id, 1))
             labels = ['None']
             return(degr_signal, labels)
@@ -2,23 +2,30 @@
 
 # import built in libarys
 import os
+from collections.abc import Mapping
 # import sys
-from IPython.display import display, HTML
+# from IPython.display import display, HTML
+from gearbox.lazy import display, HTML
 
 # import 3rd party libarys
 import numpy as np
 import pandas as pd
 # from matplotlib import pyplot as plt
-from scipy.signal import gausspulse
-from sklearn.preprocessing import MinMaxScaler
+# from scipy.signal import gausspulse
+# from sklearn.preprocessing import MinMaxScaler
 # from scipy.stats import norm
 # from numpy.random import uniform
 # from scipy.optimize import brute
 # from sklearn.metrics import mean_squared_error
 
 # import local libarys
+from gearbox.lazy import LazyModule
+from gearbox.rng import get_rng
 
 
+# scipy.signal is imported on first use (see gearbox.lazy)
+scipy_signal = LazyModule('scipy.signal')
+
 ####################################################
 #---------- Basic Helper Functions ----------------#
 
@@ -142,6 +149,18 @@ class SignalHelper():
         """
         Class constructor for signal specific helper methods
         """
+        # Random number generator (not reproducible until set_rng)
+        self.rng = get_rng(None)
+        # Scale vectors of the current torque (see create_scale_vector_cached)
+        self.scale_vector_array = None
+        self.scale_vector_cache = {}
+
+    def set_rng(self, seed, *keys):
+        """
+        Method to set the random number generator of this element,
+        keyed by (seed, element name, *keys) e.g. keys = ('run', nolc)
+        """
+        self.rng = get_rng(seed, self.name, *keys)
 
     def shift_signal(self, signal, signal_center, time, time_shift,
                      time_start=0, id_start=0):
@@ -161,31 +180,16 @@ class SignalHelper():
          [--------|-------------------------------]
          [----------|-----------------------------]
          [------------|---------------------------]]
-        """
-        # Shift signal for each gear
-        ti, tv = id_start, time_start
-        shifted_signal = np.zeros((time.shape[0], 1))
-        cid_list = list()
-        while tv < (max(time)+time_shift):
-            # Add current center id to list
-            cid_list.append(ti)
-            # Get IDs for shift
-            min_id, max_id = signal_center-ti, -(ti+1)
-            # Shift on x-Axis -> truncated signal
-            signal_i = signal[min_id:max_id]
-            # Get truncated signal to right size
-            signal_i = signal_i[0:time.shape[0]]
-            # Add teeth signal to gear signal
-            shifted_signal = np.concatenate([shifted_signal, signal_i], axis=1)
-            # Get new shift arguments
-            tv += time_shift
-            ti = np.argmin(np.abs(time - tv))
-        # Remove first zero axis
-        shifted_signal = np.delete(shifted_signal, 0, 1)
-        # Remove doubled last values (bug)
-        if cid_list[-1]==cid_list[-2]:
-            del(cid_list[-1])
-            shifted_signal = np.delete(shifted_signal, -1, 1)
+        Returns a ShiftedSignal (columns are views on the given signal,
+        no copy per shift) and the list of center ids.
+        """
+        # Get center id for each shift
+        cid_list = self.shift_cid(signal_center=signal_center, time=time,
+                                  time_shift=time_shift, time_start=time_start,
+                                  id_start=id_start)
+        # Shift on x-Axis -> column i starts at signal_center - cid_i
+        starts = signal_center - np.array(cid_list)
+        shifted_signal = ShiftedSignal(signal, starts, time.shape[0])
         return(shifted_signal, cid_list)
 
     def shift_cid(self, signal_center, time, time_shift,
@@ -206,23 +210,41 @@ class SignalHelper():
          [----------|-----------------------------]
          [------------|---------------------------]]
         """
-        # Shift signal for each gear
-        ti, tv = id_start, time_start
-        cid_list = list()
-        while tv < (max(time)+time_shift):
-            # Add current center id to list
-            cid_list.append(ti)
-            # Get IDs for shift
-            min_id, max_id = signal_center-ti, -(ti+1)
-            # Get new shift arguments
-            tv += time_shift
-            ti = np.argmin(np.abs(time - tv))
-        # Remove first zero axis
+        time = np.asarray(time).reshape(-1)
+        time_end = max(time) + time_shift
+        # Time value of each shift (cumsum adds sequentially, same
+        # values as adding time_shift in a loop)
+        no_shifts = int(np.ceil((time_end - time_start) / time_shift)) + 2
+        tvs = np.full(no_shifts, time_shift)
+        tvs[0] = time_start
+        tvs = np.cumsum(tvs)
+        tvs = tvs[:np.argmax(tvs >= time_end)]
+        # Center id of each shift: nearest time value (first id is given)
+        cids = self.get_nearest_ids(time, tvs)
+        cids[0] = id_start
+        cid_list = cids.tolist()
         # Remove doubled last values (bug)
         if cid_list[-1]==cid_list[-2]:
             del(cid_list[-1])
         return(cid_list)
 
+    def get_nearest_ids(self, time, values):
+        """
+        Method to get the id of the nearest value in a sorted
+        time array for each given value (binary search). Equals
+        np.argmin(np.abs(time - value)) for each value.
+        """
+        time = np.asarray(time).reshape(-1)
+        values = np.asarray(values).reshape(-1)
+        upper = np.clip(np.searchsorted(time, values, side='left'), 1, time.size - 1)
+        lower = upper - 1
+        # On equal distance the lower id is taken (as np.argmin)
+        take_lower = np.abs(time[lower] - values) <= np.abs(time[upper] - values)
+        nearest = np.where(take_lower, lower, upper)
+        if time.size == 1:
+            nearest = np.zeros(values.shape, dtype=np.int64)
+        return(nearest)
+
     def create_amplitude_vector(self, method='const', **kwargs):
         """
         """
@@ -253,7 +275,7 @@ class SignalHelper():
                     assert isinstance(kwargs['no_values'], int), "Using method 'gaussian', argument -no_values- must be given (integer)"
                 except KeyError:
                     raise KeyError("Using method 'gaussian', argument -mu-, -sigma- and -no_values- must be given")
-                amplitude_vector = kwargs['sigma'] * np.random.randn(kwargs['no_values']) + kwargs['mu']
+                amplitude_vector = kwargs['sigma'] * self.rng.standard_normal(kwargs['no_values']) + kwargs['mu']
                 if 'repeat' in method:
                     try:
                         assert isinstance(kwargs['repeat2no_values'], (int)), "Using method 'repeat', argument -repeat2no_values- must be given (integer)"
@@ -267,6 +289,9 @@ class SignalHelper():
 
     def create_scale_vector(self, array, method='linear', ones_base=True, **kwargs):
         """
+        Method to scale a given array (e.g. torque) by the given method
+        from [value_min, value_max] to [scale_min, scale_max] (affine
+        min max transform, same as sklearn MinMaxScaler).
         """
         array = array.reshape(-1, 1)
         if ones_base is True:
@@ -277,22 +302,21 @@ class SignalHelper():
             scale_vector = scale_base_vector
             pass
         else:
-            # Define Min Max Scaler
+            # Check Min Max arguments
             try:
                 assert isinstance(kwargs['scale_min'], (int, float)), "Using a torque scaling method, argument -scale_min- must be given (scalar)"
                 assert isinstance(kwargs['scale_max'], (int, float)), "Using a torque scaling method, argument -scale_max- must be given (scalar)"
                 assert isinstance(kwargs['value_min'], (int, float)), "Using a torque scaling method, argument -value_min- must be given (scalar)"
                 assert isinstance(kwargs['value_max'], (int, float)), "Using a torque scaling method, argument -value_max- must be given (scalar)"
-                scaler = MinMaxScaler(feature_range=(kwargs['scale_min'], kwargs['scale_max']), copy=True)
             except KeyError:
                 raise KeyError("Using a torque scaling method, argument -scale_min-, -value_min-, -value_max- and -scale_max- must be given")
             # Norm array by given value
             array = array / kwargs['norm_divisor']
+            values = np.array([kwargs['value_min'], kwargs['value_max']], dtype=np.float64)
             # Choose Method and transform
             if 'linear' in method:
                 array = array # linear scaling
-                scaler.fit(np.array([kwargs['value_min'], kwargs['value_max']], dtype=np.float64).reshape(-1, 1))
-                array = scaler.transform(array)
+                array = self.min_max_transform(array, values, kwargs['scale_min'], kwargs['scale_max'])
                 scale_vector = scale_base_vector + array
             if 'polynomial' in method:
                 try:
@@ -300,16 +324,136 @@ class SignalHelper():
                 except KeyError:
                     raise KeyError("Using method 'linear', argument -exponent- must be given (scalar)")
                 array = np.power(array, kwargs['exponent']) # polynomial scaling
-                scaler.fit(np.power(np.array([kwargs['value_min'], kwargs['value_max']]), kwargs['exponent']).reshape(-1, 1))
-                array = scaler.transform(array)
+                array = self.min_max_transform(array, np.power(values, kwargs['exponent']), kwargs['scale_min'], kwargs['scale_max'])
                 scale_vector = scale_base_vector + array
             if 'exponential' in method:
                 array = np.exp(array) # exponential scaling
-                scaler.fit(np.exp(np.array([kwargs['value_min'], kwargs['value_max']])).reshape(-1, 1))
-                array = scaler.transform(array)
+                array = self.min_max_transform(array, np.exp(values), kwargs['scale_min'], kwargs['scale_max'])
                 scale_vector = scale_base_vector + array
         return(scale_vector)
 
+    def min_max_transform(self, array, values, scale_min, scale_max):
+        """
+        Method to transform array linear, such that min(values)
+        equals scale_min and max(values) equals scale_max
+        """
+        value_min, value_max = np.min(values), np.max(values)
+        value_range = value_max - value_min
+        # Constant values are not scaled (as MinMaxScaler)
+        if value_range == 0:
+            value_range = 1.0
+        scale = (scale_max - scale_min) / value_range
+        offset = scale_min - value_min * scale
+        return(array * scale + offset)
+
+    def create_scale_vector_cached(self, array, method='linear', ones_base=True, **kwargs):
+        """
+        Method to return create_scale_vector() from cache. The cache
+        is kept per element and reset if another array (e.g. a new
+        torque) is given. Returned scale vector is read only.
+        """
+        if self.scale_vector_array is not array:
+            self.scale_vector_array = array
+            self.scale_vector_cache = {}
+        key = (method, ones_base, tuple(sorted(kwargs.items())))
+        if key not in self.scale_vector_cache:
+            scale_vector = self.create_scale_vector(array, method=method, ones_base=ones_base, **kwargs)
+            scale_vector.setflags(write=False)
+            self.scale_vector_cache[key] = scale_vector
+        return(self.scale_vector_cache[key])
+
+class ShiftedSignal():
+    """
+    Matrix of a signal shifted by given start ids, without storing
+    a copy per shift. Column i equals signal[starts[i]:starts[i]+no_samples].
+    Supports shape, column access (matrix[:, i]), gathering given rows
+    and np.asarray(matrix) (materializes the full matrix).
+    """
+
+    def __init__(self, signal, starts, no_samples):
+        """
+        Class constructor for shifted signal matrix
+        """
+        self.signal = np.asarray(signal).reshape(-1)
+        self.starts = np.asarray(starts, dtype=np.int64).reshape(-1)
+        self.no_samples = no_samples
+        assert self.starts.min() >= 0, 'Shifted signal exceeds lower bound of given signal'
+        assert self.starts.max() + no_samples <= self.signal.size, 'Shifted signal exceeds upper bound of given signal'
+
+    @property
+    def shape(self):
+        return((self.no_samples, self.starts.size))
+
+    def column(self, idx):
+        """
+        Method to return column idx as view on the signal
+        """
+        start = self.starts[idx]
+        return(self.signal[start:start+self.no_samples])
+
+    def gather(self, row_ids, columns=slice(None)):
+        """
+        Method to return a matrix of the given rows ids and columns
+        -> matrix[row_ids, :] (one allocation)
+        """
+        return(self.signal[np.add.outer(row_ids, self.starts[columns])])
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        rows, columns = key
+        if isinstance(columns, (int, np.integer)):
+            return(self.column(columns)[rows])
+        row_ids = np.arange(self.no_samples)[rows]
+        return(self.gather(row_ids, columns))
+
+    def __array__(self, dtype=None, copy=None):
+        matrix = self.gather(np.arange(self.no_samples))
+        if dtype is not None:
+            matrix = matrix.astype(dtype)
+        return(matrix)
+
+class ToothLoads(Mapping):
+    """
+    Loads per tooth as teeth x meshes array (row tooth-1, nan padded
+    if teeth have a different number of meshes). Read only mapping
+    with keys str(tooth) for backward compatibility, e.g.
+    loads['1'] -> array([155, 177, 169,....])
+    """
+
+    def __init__(self, array, counts):
+        """
+        Class constructor for loads per tooth
+        """
+        self.array = np.asarray(array, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(-1)
+        assert self.array.shape[0] == self.counts.size, 'Number of rows and counts must be equal'
+
+    @property
+    def equal_counts(self):
+        return(bool(np.all(self.counts == self.array.shape[1])))
+
+    def __getitem__(self, key):
+        # Only keys str(tooth) as the previous dict
+        if not (isinstance(key, str) and key.isdigit() and (key == str(int(key)))):
+            raise KeyError(key)
+        row = int(key) - 1
+        if not (0 <= row < self.counts.size):
+            raise KeyError(key)
+        return(self.array[row, :self.counts[row]])
+
+    def __len__(self):
+        return(self.counts.size)
+
+    def __iter__(self):
+        return(iter([str(idx+1) for idx in range(self.counts.size)]))
+
+    def to_dict(self):
+        """
+        Method to return the loads as dict of lists (previous format)
+        """
+        return({key: list(value) for key, value in self.items()})
+
 ####################################################
 #----------------- RAW SIGNALS --------------------#
 class StationarySignals():
@@ -391,9 +535,9 @@ class NonstationarySignals():
             time array, a frequency and amplitude.
             """
             if retquad is False:
-                signal = gausspulse(time, fc=frq, bw=bw, bwr=bwr, retquad=False, retenv=False)
+                signal = scipy_signal.gausspulse(time, fc=frq, bw=bw, bwr=bwr, retquad=False, retenv=False)
             elif retquad is True:
-                _, signal = gausspulse(time, fc=frq, bw=bw, bwr=bwr, retquad=True, retenv=False)
+                _, signal = scipy_signal.gausspulse(time, fc=frq, bw=bw, bwr=bwr, retquad=True, retenv=False)
             signal = signal * ampl
             signal_center = np.argmin(np.abs(time))
             signal = signal.reshape(-1, 1)
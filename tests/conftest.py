@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import sys
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# GearboxParams is located in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GearboxParams as params
+from gearbox import Gearbox
+
+rotational_frequency_in = 42.301587301587304 # U/s | float
+sample_interval = 0.25 # s | float
+sample_rate = 12800 # Hz | float
+
+
+def get_sample_time_torque():
+    """
+    Method to get a sample time vector for the torque definition
+    (see gearbox_functions.get_sample_time_torque)
+    """
+    time2tooth = (1 / rotational_frequency_in) / params.GearIn['no_teeth']
+    toothmeshlcm = np.lcm(params.GearIn['no_teeth'], params.GearOut['no_teeth'])
+    return(np.arange(0, time2tooth * toothmeshlcm, 1/sample_rate))
+
+
+@pytest.fixture
+def torque():
+    """
+    Constant initial torque
+    """
+    return(np.ones(get_sample_time_torque().shape) * 200)
+
+
+@pytest.fixture
+def make_model():
+    """
+    Factory of Gearbox models with the elements of GearboxParams,
+    keyword arguments are passed to Gearbox (elements given by
+    keyword replace the ones of GearboxParams)
+    """
+    def make_model(**kwargs):
+        elements = {name: getattr(params, name) for name in ['GearIn', 'GearOut',
+                                                             'Bearing1', 'Bearing2', 'Bearing3', 'Bearing4',
+                                                             'Deg_GearIn', 'Deg_GearOut',
+                                                             'Deg_Bearing1', 'Deg_Bearing2', 'Deg_Bearing3', 'Deg_Bearing4',
+                                                             'GearDegVibDictIn', 'GearDegVibDictOut']}
+        kwargs = dict(dict({'seed': 8, 'verbose': 0, 'fixed_start': True}, **elements), **kwargs)
+        return(Gearbox(rotational_frequency_in,
+                       sample_interval, sample_rate,
+                       **kwargs))
+    return(make_model)
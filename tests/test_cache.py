@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.vibration import Gearbox_Vibration
+from gearbox.cache import VibrationCache, get_cache_key
+
+
+def test_cache_hit_equals_initialize(make_model, torque, tmp_path, monkeypatch):
+    """
+    A second model with the same arguments loads the initialized
+    Vibration from the cache and runs as the first model
+    """
+    cache = VibrationCache(str(tmp_path))
+    model = make_model(vibration_cache=cache)
+    model.initialize(torque)
+    assert [key for key, _, _ in cache.entries()] == [model.ga_vibration_key]
+    def init_vibration(self, torque):
+        raise AssertionError('Vibration is initialized instead of loaded from cache')
+    monkeypatch.setattr(Gearbox_Vibration, 'init_vibration', init_vibration)
+    model_cached = make_model(vibration_cache=str(tmp_path))
+    model_cached.initialize(torque)
+    for nolc in [1e6, 8e6]:
+        np.testing.assert_array_equal(model_cached.run(nolc), model.run(nolc))
+
+
+def test_cache_skips_unseeded_model(make_model, torque, tmp_path):
+    """
+    Models without seed are neither stored nor loaded
+    """
+    cache = VibrationCache(str(tmp_path))
+    model = make_model(seed=None, vibration_cache=cache)
+    model.initialize(torque)
+    assert cache.entries() == []
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """
+    Least recently used entries are removed if the cache exceeds
+    max_bytes, the entry just stored is kept
+    """
+    cache = VibrationCache(str(tmp_path), max_bytes=2**17 + 2**14, min_nbytes=2**10)
+    for idx, key in enumerate(['a', 'b']):
+        cache.store(key, {'array': np.full(2**13, idx, dtype=np.float64)})
+        os.utime(cache.get_path(key), (idx, idx))
+    # Load marks a as recently used
+    np.testing.assert_array_equal(cache.load('a')['array'], 0)
+    cache.store('c', {'array': np.ones(2**13)})
+    assert ('a' in cache) and ('b' not in cache) and ('c' in cache)
+    assert cache.load('b') is None
+    assert isinstance(cache.load('c')['array'], np.memmap)
+
+
+def test_cache_key():
+    """
+    Cache keys do not depend on dict order, any value changes them
+    """
+    key = get_cache_key(GearIn={'no_teeth': 24, 'mu': 0.5}, torque=np.ones(10))
+    assert key == get_cache_key(GearIn={'mu': 0.5, 'no_teeth': 24}, torque=np.ones(10))
+    assert key != get_cache_key(GearIn={'no_teeth': 24, 'mu': 0.5 + 1e-15}, torque=np.ones(10))
+    assert key != get_cache_key(GearIn={'no_teeth': 24, 'mu': 0.5}, torque=np.ones(11))
+    with pytest.raises(TypeError):
+        get_cache_key(GearIn=object())
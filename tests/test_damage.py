@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.degradation.helper import Degradation_Helper
+
+n_values = [1, 6, 7, 13, 14, 100, 1234567]
+
+
+@pytest.mark.parametrize('no_values', n_values)
+def test_sum_repeat_equals_repeat(no_values):
+    """
+    sum_repeat2no_values gives the sum of the repeated vector
+    """
+    helper = Degradation_Helper()
+    vector = np.linspace(0.5, 2.0, 7) ** 3
+    expected = np.sum(helper.repeat2no_values(vector, no_values))
+    np.testing.assert_allclose(helper.sum_repeat2no_values(vector, no_values), expected, rtol=1e-12)
+    matrix = np.stack([vector, vector[::-1] * 2])
+    expected_rows = [np.sum(helper.repeat2no_values(row, no_values)) for row in matrix]
+    np.testing.assert_allclose(helper.sum_repeat2no_values(matrix, no_values), expected_rows, rtol=1e-12)
+
+
+def test_sum_repeat_array_equals_repeat():
+    """
+    sum_repeat2no_values_array gives one sum per number of values
+    """
+    helper = Degradation_Helper()
+    matrix = np.stack([np.linspace(0.5, 2.0, 7), np.linspace(3.0, 1.0, 7)])
+    sums = helper.sum_repeat2no_values_array(matrix, n_values)
+    assert sums.shape == (len(n_values), 2)
+    for idx, no_values in enumerate(n_values):
+        for row in range(2):
+            expected = np.sum(helper.repeat2no_values(matrix[row], no_values))
+            np.testing.assert_allclose(sums[idx, row], expected, rtol=1e-12)
+
+
+def test_damage_fractions_equal_repeated_loads(make_model, torque):
+    """
+    The damage of n load cycles equals the sum of the damage of
+    each load cycle with the loads repeated to n values
+    """
+    model = make_model()
+    model.initialize(torque)
+    torque_varying = torque + np.sin(np.arange(torque.size) / 7.0) * 5
+    loads = model.Vibration.get_loads(torque_varying)['GearIn']
+    gear = model.Degradation.GearIn_Degradation
+    n_fracs = [1, 1000, 478901]
+    damage_fracs = gear.get_damage_fractions(loads, n_fracs)
+    for idx, tooth in enumerate(gear.s0_tooth):
+        N1 = gear.s0_neol[idx] - gear.s0_n0[idx]
+        damage_equivalent = 1 / (N1 * np.power(np.array(loads[str(tooth)]) / gear.woehler_torqp, -1*gear.woehler_k))
+        for step, n_frac in enumerate(n_fracs):
+            expected = np.sum(gear.repeat2no_values(damage_equivalent, n_frac))
+            np.testing.assert_allclose(damage_fracs[step, idx], expected, rtol=1e-10)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+
+# import local libarys
+import GearboxParams as params
+from conftest import rotational_frequency_in, sample_interval, sample_rate
+from gearbox import fleet
+from gearbox.fleet import Gearbox_Fleet, params_from_module
+
+
+def test_fleet_in_process_equals_pool(torque):
+    """
+    processes=1 gives the same results as a process pool and
+    keeps no model in the module state of this process
+    """
+    fleet_params = params_from_module(params, rotational_frequency_in, sample_interval,
+                                      sample_rate, seed=8)
+    schedule = [(1e6, None), (2e6, torque * 1.1), (3e6, None)]
+    seeds = [1, 2, 3]
+    results = Gearbox_Fleet(fleet_params, torque, schedule, processes=1).run_all(seeds)
+    assert fleet.worker_state == {}
+    results_pool = Gearbox_Fleet(fleet_params, torque, schedule, processes=2,
+                                 shared_templates=True).run_all(seeds)
+    for seed in seeds:
+        assert results[seed]['nolc'] == results_pool[seed]['nolc']
+        np.testing.assert_array_equal(np.stack(results[seed]['vibration']),
+                                      np.stack(results_pool[seed]['vibration']))
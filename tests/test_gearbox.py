@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+from copy import deepcopy as dc
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox import Gearbox
+
+nolcs = np.linspace(0.5e6, 12e6, 24)
+
+
+def get_torques(torque):
+    """
+    Method to get one torque (or None) per nolc, torque
+    is changed twice during the schedule
+    """
+    torques = [None] * nolcs.size
+    torques[5] = torque * 1.1
+    torques[15] = torque * 0.9
+    return(torques)
+
+
+def run_loop(model, torques, stop=None):
+    """
+    Method to run the model for the given nolcs by run() and set(),
+    returns the vibration (nolcs x samples) and statei of each nolc
+    """
+    vibrations, stateis = [], []
+    for nolc, torque in list(zip(nolcs, torques))[:stop]:
+        vibrations.append(model.run(nolc).reshape(-1))
+        stateis.append(dc(model.ga_statei[-1]))
+        if torque is not None:
+            model.set(nolc, torque)
+    return(np.stack(vibrations), stateis)
+
+
+def run_loop_degradation(model, torques, start=0, stop=None):
+    """
+    Method to run the degradation only model for the given nolcs
+    """
+    for nolc, torque in list(zip(nolcs, torques))[start:stop]:
+        model.run(nolc)
+        if torque is not None:
+            model.set(nolc, torque)
+
+
+@pytest.mark.parametrize('fixed_start', [True, False])
+def test_run_schedule_equals_run_loop(make_model, torque, fixed_start):
+    """
+    run_schedule() gives the same vibration and states as run()/set()
+    """
+    torques = get_torques(torque)
+    model = make_model(fixed_start=fixed_start)
+    model.initialize(torque)
+    vibration_loop, stateis = run_loop(model, torques)
+    model_schedule = make_model(fixed_start=fixed_start)
+    model_schedule.initialize(torque)
+    vibration, states = model_schedule.run_schedule(nolcs, torques)
+    np.testing.assert_array_equal(vibration, vibration_loop)
+    assert states['GearOut'] is None
+    pitting, damage = states['GearIn']
+    for idx, statei in enumerate(stateis):
+        np.testing.assert_allclose(pitting[idx, :], statei['GearIn'].iloc[0, :], rtol=1e-12)
+        np.testing.assert_allclose(damage[idx, :], statei['GearIn'].iloc[1, :], rtol=1e-12)
+    assert model_schedule.ga_load_cycle == model.ga_load_cycle
+    assert model_schedule.ga_load_cycle_torquechange == model.ga_load_cycle_torquechange
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_run_schedule_workers(make_model, torque, executor):
+    """
+    Parallel window rendering gives the same vibration as workers=1
+    """
+    torques = get_torques(torque)
+    model = make_model(fixed_start=False)
+    model.initialize(torque)
+    vibration, _ = model.run_schedule(nolcs, torques)
+    model_parallel = make_model(fixed_start=False)
+    model_parallel.initialize(torque)
+    vibration_parallel, _ = model_parallel.run_schedule(nolcs, torques, workers=2, executor=executor)
+    np.testing.assert_array_equal(vibration_parallel, vibration)
+
+
+def test_save_load_continues_run(make_model, torque, tmp_path):
+    """
+    A model restored by load() continues run() and set() bit-identical
+    """
+    torques = get_torques(torque)
+    model = make_model()
+    model.initialize(torque)
+    run_loop(model, torques, stop=8)
+    model.save(str(tmp_path / 'snapshot'))
+    model_loaded = Gearbox.load(str(tmp_path / 'snapshot'))
+    for nolc, torque_i in list(zip(nolcs, torques))[8:]:
+        np.testing.assert_array_equal(model_loaded.run(nolc), model.run(nolc))
+        if torque_i is not None:
+            model.set(nolc, torque_i)
+            model_loaded.set(nolc, torque_i)
+    np.testing.assert_array_equal(model_loaded.ga_statei[-1]['GearIn'].values, model.ga_statei[-1]['GearIn'].values)
+
+
+def test_resume_continues_run(make_model, torque, tmp_path):
+    """
+    A model restored by resume() continues at the last checkpoint as
+    the uninterrupted model
+    """
+    torques = get_torques(torque)
+    model = make_model()
+    model.initialize(torque)
+    model.enable_checkpoints(str(tmp_path / 'checkpoints'), every=3)
+    run_loop(model, torques, stop=10)
+    # Last checkpoint after the 9th run, the 10th run is repeated
+    model_resumed = Gearbox.resume(str(tmp_path / 'checkpoints'))
+    assert model_resumed.ga_load_cycle[-1] == nolcs[8]
+    model_reference = make_model()
+    model_reference.initialize(torque)
+    run_loop(model_reference, torques, stop=9)
+    vibration_resumed = []
+    vibration_reference = []
+    for nolc, torque_i in list(zip(nolcs, torques))[9:]:
+        vibration_resumed.append(model_resumed.run(nolc))
+        vibration_reference.append(model_reference.run(nolc))
+        if torque_i is not None:
+            model_resumed.set(nolc, torque_i)
+            model_reference.set(nolc, torque_i)
+    np.testing.assert_array_equal(np.stack(vibration_resumed), np.stack(vibration_reference))
+    np.testing.assert_array_equal(model_resumed.ga_statei[-1]['GearIn'].values, model_reference.ga_statei[-1]['GearIn'].values)
+
+
+def test_state_at_equals_run(make_model, torque):
+    """
+    state_at() gives the state run() reaches at that nolc, between
+    previous runs and after the current nolc
+    """
+    torques = get_torques(torque)
+    model = make_model(degradation_only=True)
+    model.initialize(torque)
+    run_loop_degradation(model, torques, stop=10)
+    nolc_between = (nolcs[6] + nolcs[7]) / 2
+    nolc_future = nolcs[12] + 1234
+    state_between = model.state_at(nolc_between)
+    state_future = model.state_at(nolc_future)
+    # States of the model are not changed by state_at
+    model.run(nolc_future)
+    np.testing.assert_allclose(state_future['GearIn'].values, model.ga_statei[-1]['GearIn'].values, rtol=1e-12)
+    model_reference = make_model(degradation_only=True)
+    model_reference.initialize(torque)
+    run_loop_degradation(model_reference, torques, stop=7)
+    model_reference.run(nolc_between)
+    np.testing.assert_allclose(state_between['GearIn'].values, model_reference.ga_statei[-1]['GearIn'].values, rtol=1e-12)
+
+
+def test_predict_eol_equals_run(make_model, torque):
+    """
+    predict_eol() gives the nolc at which run() reaches damage 1,
+    before and after the crossing has been run
+    """
+    torques = get_torques(torque)
+    model = make_model(degradation_only=True)
+    model.initialize(torque)
+    run_loop_degradation(model, torques, stop=10)
+    eol = model.predict_eol()['GearIn']
+    # Not reached yet, but before the last nolc
+    assert np.all((eol['nolc_damage'] > nolcs[9]) & (eol['nolc_damage'] < nolcs[-1]))
+    run_loop_degradation(model, torques, start=10)
+    eol_past = model.predict_eol()['GearIn']
+    np.testing.assert_allclose(eol_past['nolc_damage'], eol['nolc_damage'], rtol=1e-12)
+    model_reference = make_model(degradation_only=True)
+    model_reference.initialize(torque)
+    run_loop_degradation(model_reference, torques, stop=int(np.searchsorted(nolcs, eol['nolc_damage'].min())))
+    for tooth, nolc_eol in zip(eol['tooth'], eol['nolc_damage']):
+        assert model_reference.state_at(nolc_eol - 1)['GearIn'].iloc[1][tooth] < 1
+        assert model_reference.state_at(nolc_eol)['GearIn'].iloc[1][tooth] >= 1
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import sys
+import subprocess
+
+# Maximum import time of "import gearbox" in a fresh process in seconds
+# (measured about 0.3 s, pandas takes most of it)
+IMPORT_BUDGET = 1.0
+# Modules which must not be loaded by "import gearbox" (see gearbox.lazy)
+HEAVY_MODULES = ['IPython', 'matplotlib', 'sklearn', 'scipy.signal']
+# Repository root (gearbox is imported from there)
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import_time(module='gearbox', repeat=3):
+    """
+    Method to measure the import time of the given module in a
+    fresh python process. Returns the minimum time of all repeats
+    in seconds and a list of loaded HEAVY_MODULES.
+    """
+    code = ('import sys, time; start = time.perf_counter(); import %s; '
+            'print(time.perf_counter() - start); '
+            'print(",".join(m for m in %r if m in sys.modules))' % (module, HEAVY_MODULES))
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True, cwd=root,
+                                capture_output=True, text=True).stdout.split('\n')
+        times.append(float(output[0]))
+        loaded = [name for name in output[1].split(',') if name != '']
+    return(min(times), loaded)
+
+
+def test_import_is_headless_and_fast():
+    """
+    import gearbox loads no heavy module and stays within the budget
+    """
+    import_time, loaded = measure_import_time()
+    assert len(loaded) == 0, 'Import of gearbox loads %s' % (str(loaded))
+    assert import_time <= IMPORT_BUDGET, 'Import of gearbox takes %.3f s (budget %.3f s)' % (import_time, IMPORT_BUDGET)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.vibration.helper import ToothLoads
+
+
+def load_per_tooth_loop(gear, torque):
+    """
+    Method to get the loads per tooth as dict of lists by a loop
+    over all tooth meshes (previous load_per_tooth)
+    """
+    load_dict = {str(idx+1): [] for idx in range(gear.no_teeth)}
+    for idx, id_low_up in enumerate(gear.ids_bounds_torque):
+        low_id = max([0, id_low_up[0]])
+        up_id = min([gear.torque_sample_time.shape[0], id_low_up[1]])
+        load_dict[str(gear.teeth_no_list_torque[idx])].append(np.mean(torque[low_id:up_id]))
+    return(load_dict)
+
+
+def test_load_per_tooth_equals_mean(make_model, torque):
+    """
+    Vectorized load_per_tooth gives the mean torque of each mesh
+    """
+    model = make_model()
+    model.initialize(torque)
+    torque_varying = torque + np.sin(np.arange(torque.size) / 7.0) * 5
+    loads = model.Vibration.get_loads(torque_varying)
+    for key in ['GearIn', 'GearOut']:
+        gear = getattr(model.Vibration, key)
+        expected = load_per_tooth_loop(gear, model.Vibration.torque_in)
+        assert isinstance(loads[key], ToothLoads)
+        assert list(loads[key]) == list(expected)
+        for tooth, values in expected.items():
+            np.testing.assert_allclose(loads[key][tooth], values, rtol=1e-12)
+
+
+def test_tooth_loads_mapping():
+    """
+    ToothLoads behaves as a read only dict with keys str(tooth)
+    """
+    loads = ToothLoads(np.array([[1., 2., np.nan], [3., 4., 5.]]), [2, 3])
+    np.testing.assert_array_equal(loads['1'], [1., 2.])
+    np.testing.assert_array_equal(loads.get('2'), [3., 4., 5.])
+    assert (len(loads) == 2) and ('2' in loads) and (loads.get('3') is None)
+    assert loads.to_dict() == {'1': [1., 2.], '2': [3., 4., 5.]}
+    for key in ['3', '0', '01', 1, 'x', None]:
+        with pytest.raises(KeyError):
+            loads[key]
+
+
+def test_run_degradation_with_dict_loads(make_model, torque):
+    """
+    Degradation accepts loads as dict of lists (previous format)
+    with the same result as ToothLoads
+    """
+    model = make_model()
+    model.initialize(torque)
+    loads = model.Vibration.get_loads(torque * 1.1)
+    loads_dict = {key: (value.to_dict() if key.startswith('Gear') else value) for key, value in loads.items()}
+    statei = model.Degradation.run_degradation(2e6, loads)['GearIn'].values.copy()
+    model.reinitialize(torque)
+    statei_dict = model.Degradation.run_degradation(2e6, loads_dict)['GearIn'].values
+    np.testing.assert_allclose(statei_dict, statei, rtol=1e-12)
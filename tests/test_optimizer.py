@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+from itertools import product as cart_prod
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.degradation.helper import Optimizer_Helper
+
+# Coarse version of the GridSearch slices in GearboxParams
+theta1s = np.arange(0.0001, 0.0902, 0.01)
+theta2s = np.arange(0.10/1e6, 1.51/1e6, 0.05/1e6)
+theta3s = np.arange(-2.0, 0.5, 0.05)
+
+
+def opt_exp_function_loop(helper, x, y):
+    """
+    Method to score each theta combination one by one (previous
+    opt_exp_function_brute), returns the first combination with
+    minimal mse
+    """
+    best = (np.nan, np.nan, np.nan, np.inf)
+    for theta1, theta2, theta3 in cart_prod(theta1s, theta2s, theta3s):
+        y_pred = helper.exp_function(x, theta1, theta2, theta3).reshape(-1)
+        if helper.exp_function(np.array(0), theta1, theta2, theta3) <= 0:
+            continue
+        mse = np.mean(np.square(y - y_pred))
+        if mse < best[3]:
+            best = (theta1, theta2, theta3, mse)
+    return(best)
+
+
+@pytest.mark.parametrize('chunk_size', [2**20, 2**8])
+@pytest.mark.parametrize('x, y', [((5.946660e6, 9.676344e6), (0.856096, 4.0)),
+                                  ((1.0e6, 4.0e6), (0.05, 2.5))])
+def test_grid_equals_loop(x, y, chunk_size):
+    """
+    opt_exp_function_grid finds the same thetas and mse as scoring
+    every combination by a loop
+    """
+    helper = Optimizer_Helper()
+    x, y = np.array(x), np.array(y)
+    theta1, theta2, theta3, mse = helper.opt_exp_function_grid(x, y, theta1s, theta2s, theta3s,
+                                                               chunk_size=chunk_size)
+    expected = opt_exp_function_loop(helper, x, y)
+    assert (theta1, theta2, theta3) == expected[:3]
+    np.testing.assert_allclose(mse, expected[3], rtol=1e-12)
+
+
+def test_grid_without_valid_combination():
+    """
+    opt_exp_function_grid returns nan if no combination is valid
+    """
+    helper = Optimizer_Helper()
+    result = helper.opt_exp_function_grid(np.array((1e6, 2e6)), np.array((1., 2.)),
+                                          theta1s, theta2s, np.array([-5., -3.]))
+    assert np.all(np.isnan(result))
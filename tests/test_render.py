@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+nolcs = np.linspace(0.5e6, 12e6, 12)
+
+
+def get_torques(torque):
+    """
+    Method to get one torque (or None) per nolc
+    """
+    torques = [None] * nolcs.size
+    torques[4] = torque * 1.1
+    return(torques)
+
+
+@pytest.mark.parametrize('fixed_start', [True, False])
+def test_render_vibration_equals_full_model(make_model, torque, fixed_start):
+    """
+    A degradation only run rendered afterwards gives the vibration
+    and states of a model running the vibration at each nolc
+    """
+    torques = get_torques(torque)
+    model = make_model(fixed_start=fixed_start)
+    model.initialize(torque)
+    vibrations = []
+    for nolc, torque_i in zip(nolcs, torques):
+        vibrations.append(model.run(nolc).reshape(-1))
+        if torque_i is not None:
+            model.set(nolc, torque_i)
+    vibrations = np.stack(vibrations)
+    model_deferred = make_model(fixed_start=fixed_start, degradation_only=True)
+    model_deferred.initialize(torque)
+    assert not model_deferred.Vibration.signals_initialized()
+    vibration, states = model_deferred.run_schedule(nolcs, torques)
+    assert vibration is None
+    np.testing.assert_array_equal(model_deferred.render_vibration(states), vibrations)
+    # Subset of the recorded nolcs and nolcs taken from the model
+    np.testing.assert_array_equal(model_deferred.render_vibration(states, nolcs=nolcs[[2, 7]]), vibrations[[2, 7]])
+    np.testing.assert_array_equal(model_deferred.render_vibration(nolcs=nolcs[-3:]), vibrations[-3:])
+    with pytest.raises(AssertionError):
+        model_deferred.render_vibration(states, nolcs=[1.5e6])
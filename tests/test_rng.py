@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+
+# import local libarys
+from gearbox.rng import get_rng
+
+
+def test_rng_streams_are_keyed():
+    """
+    get_rng gives the same stream for the same seed and keys only,
+    independent of the global numpy random state
+    """
+    np.random.seed(1)
+    values = get_rng(8, 'GearIn', 'run', 1000).standard_normal(5)
+    np.random.seed(2)
+    np.random.standard_normal(10)
+    np.testing.assert_array_equal(get_rng(8, 'GearIn', 'run', 1000.0).standard_normal(5), values)
+    for keys in [(9, 'GearIn', 'run', 1000), (8, 'GearOut', 'run', 1000), (8, 'GearIn', 'run', 1001)]:
+        assert not np.array_equal(get_rng(*keys).standard_normal(5), values)
+
+
+def test_vibration_independent_of_order(make_model, torque):
+    """
+    The vibration of a nolc does not depend on the order in which
+    load cycles are rendered or on the global numpy random state
+    """
+    model = make_model(fixed_start=False)
+    model.initialize(torque)
+    nolcs = [3e6, 7e6, 11e6]
+    stateis = {nolc: model.state_at(nolc) for nolc in nolcs}
+    vibrations = {nolc: model.Vibration.run_vibration(nolc, torque, statei=stateis[nolc]).copy() for nolc in nolcs}
+    for nolc in nolcs[::-1]:
+        np.random.seed(int(nolc) % 2**32)
+        np.testing.assert_array_equal(model.Vibration.run_vibration(nolc, torque, statei=stateis[nolc]), vibrations[nolc])
+    assert not np.array_equal(vibrations[nolcs[0]], vibrations[nolcs[1]])
+
+
+def test_state0_independent_of_global_state(make_model, torque):
+    """
+    Models with the same seed draw the same initial states
+    """
+    model = make_model()
+    model.initialize(torque)
+    np.random.seed(123)
+    np.random.uniform(size=100)
+    model_other = make_model()
+    model_other.initialize(torque)
+    for key in ['GearIn_Degradation', 'GearOut_Degradation']:
+        state0 = getattr(model.Degradation, key).state0
+        state0_other = getattr(model_other.Degradation, key).state0
+        if state0 is None:
+            assert state0_other is None
+        else:
+            np.testing.assert_array_equal(state0_other.to_numpy(), state0.to_numpy())
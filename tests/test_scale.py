@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.vibration.helper import SignalHelper
+
+scale_kwargs = {'scale_min': 0.0, 'scale_max': 0.2,
+                'value_min': 0.0, 'value_max': 500.0,
+                'exponent': 2, 'norm_divisor': 200.0}
+
+
+def create_scale_vector_scaler(array, method, ones_base, **kwargs):
+    """
+    Method to scale the given array by sklearn MinMaxScaler (previous
+    create_scale_vector)
+    """
+    MinMaxScaler = pytest.importorskip('sklearn.preprocessing').MinMaxScaler
+    array = array.reshape(-1, 1) / kwargs['norm_divisor']
+    values = np.array([kwargs['value_min'], kwargs['value_max']], dtype=np.float64)
+    if 'polynomial' in method:
+        array, values = np.power(array, kwargs['exponent']), np.power(values, kwargs['exponent'])
+    elif 'exponential' in method:
+        array, values = np.exp(array), np.exp(values)
+    scaler = MinMaxScaler(feature_range=(kwargs['scale_min'], kwargs['scale_max']))
+    scaler.fit(values.reshape(-1, 1))
+    return(float(ones_base) + scaler.transform(array))
+
+
+@pytest.mark.parametrize('ones_base', [True, False])
+@pytest.mark.parametrize('method', ['linear', 'polynomial', 'exponential'])
+def test_scale_vector_equals_min_max_scaler(method, ones_base):
+    """
+    create_scale_vector gives the same values as MinMaxScaler
+    """
+    array = np.linspace(50, 450, 1000) + np.sin(np.arange(1000) / 9.0) * 20
+    expected = create_scale_vector_scaler(array, method, ones_base, **scale_kwargs)
+    scale_vector = SignalHelper().create_scale_vector(array, method=method, ones_base=ones_base, **scale_kwargs)
+    assert scale_vector.shape == (array.size, 1)
+    np.testing.assert_allclose(scale_vector, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_scale_vector_cache():
+    """
+    create_scale_vector_cached computes the scale vector once per
+    array and returns it read only
+    """
+    helper = SignalHelper()
+    array = np.linspace(50, 450, 100)
+    scale_vector = helper.create_scale_vector_cached(array, method='linear', **scale_kwargs)
+    assert helper.create_scale_vector_cached(array, method='linear', **scale_kwargs) is scale_vector
+    assert not scale_vector.flags.writeable
+    np.testing.assert_array_equal(scale_vector, helper.create_scale_vector(array, method='linear', **scale_kwargs))
+    # Other arguments and another array are computed again
+    scale_vector_poly = helper.create_scale_vector_cached(array, method='polynomial', **scale_kwargs)
+    assert scale_vector_poly is not scale_vector
+    array_new = array * 1.1
+    scale_vector_new = helper.create_scale_vector_cached(array_new, method='linear', **scale_kwargs)
+    np.testing.assert_array_equal(scale_vector_new, helper.create_scale_vector(array_new, method='linear', **scale_kwargs))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import pickle
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+
+def test_templates_equal_initialize(make_model, torque):
+    """
+    A model initialized from exported templates runs as a model
+    initialized by itself, large arrays are read only shared memory
+    """
+    model = make_model()
+    model.initialize(torque)
+    with model.export_templates() as handle:
+        assert len(handle.names) > 0
+        model_shared = make_model()
+        model_shared.initialize(torque, templates=pickle.loads(pickle.dumps(handle)))
+        assert len(model_shared.Vibration.shared_blocks) > 0
+        for nolc in [1e6, 8e6]:
+            np.testing.assert_array_equal(model_shared.run(nolc), model.run(nolc))
+        del model_shared
+
+
+@pytest.mark.parametrize('kwargs, factor', [({'seed': 9}, 1.0), ({'fixed_start': False}, 1.0), ({}, 1.1)])
+def test_templates_reject_other_arguments(make_model, torque, kwargs, factor):
+    """
+    Templates exported with other model arguments or torque are
+    rejected
+    """
+    model = make_model()
+    model.initialize(torque)
+    with model.export_templates() as handle:
+        with pytest.raises(AssertionError, match='Templates must be exported'):
+            make_model(**kwargs).initialize(torque * factor, templates=handle)
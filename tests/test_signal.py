@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.vibration.helper import SignalHelper
+
+time = np.arange(0, 0.05, 1/12800)
+time_shift = 1 / (42.301587301587304 * 24)
+signal_center = time.size + 5
+signal = np.sin(np.arange(2 * time.size + 10) / 11.0)
+
+
+def shift_signal_loop(signal, signal_center, time, cid_list):
+    """
+    Method to build the shifted signal matrix by concatenating one
+    truncated copy per center id (previous shift_signal)
+    """
+    shifted_signal = np.zeros((time.shape[0], 1))
+    for ti in cid_list:
+        signal_i = signal[signal_center-ti:-(ti+1)].reshape(-1, 1)
+        shifted_signal = np.concatenate([shifted_signal, signal_i[0:time.shape[0]]], axis=1)
+    return(np.delete(shifted_signal, 0, 1))
+
+
+def shift_cid_loop(time, time_shift, time_start=0, id_start=0):
+    """
+    Method to get the center id of each shift by np.argmin per
+    shift (previous shift_cid)
+    """
+    ti, tv = id_start, time_start
+    cid_list = list()
+    while tv < (max(time)+time_shift):
+        cid_list.append(ti)
+        tv += time_shift
+        ti = np.argmin(np.abs(time - tv))
+    if cid_list[-1]==cid_list[-2]:
+        del(cid_list[-1])
+    return(cid_list)
+
+
+@pytest.mark.parametrize('time_start, id_start', [(0, 0), (0.0003, 4)])
+def test_shifted_signal_equals_concatenation(time_start, id_start):
+    """
+    ShiftedSignal gives the same matrix as one copy per shift, its
+    columns are views on the given signal
+    """
+    helper = SignalHelper()
+    shifted, cid_list = helper.shift_signal(signal, signal_center, time, time_shift,
+                                            time_start=time_start, id_start=id_start)
+    expected = shift_signal_loop(signal, signal_center, time, cid_list)
+    assert shifted.shape == expected.shape
+    np.testing.assert_array_equal(np.asarray(shifted), expected)
+    np.testing.assert_array_equal(shifted[:, 3], expected[:, 3])
+    np.testing.assert_array_equal(shifted[10:20, 2:5], expected[10:20, 2:5])
+    np.testing.assert_array_equal(shifted.gather(np.array([0, 7, 100])), expected[[0, 7, 100], :])
+    assert np.shares_memory(shifted.column(3), signal)
+
+
+def test_shifted_signal_bounds():
+    """
+    ShiftedSignal rejects shifts outside of the given signal
+    """
+    with pytest.raises(AssertionError):
+        SignalHelper().shift_signal(signal[:time.size], signal_center, time, time_shift)
+
+
+def test_overlap_add_equals_matrix(make_model, torque):
+    """
+    gear_synthesis='overlap_add' gives the same vibration as the sum
+    of the samples x meshes matrix
+    """
+    models = {}
+    for gear_synthesis in ['matrix', 'overlap_add']:
+        models[gear_synthesis] = make_model(gear_synthesis=gear_synthesis)
+        models[gear_synthesis].initialize(torque)
+    assert models['overlap_add'].Vibration.GearIn.base_signal is None
+    for nolc in [1e6, 6e6, 12e6]:
+        vibration = models['matrix'].run(nolc)
+        np.testing.assert_allclose(models['overlap_add'].run(nolc), vibration, rtol=0, atol=1e-10)
+        for model in models.values():
+            model.set(nolc, torque * 1.2)
+
+
+@pytest.mark.parametrize('time_shift_i', [time_shift, 1/12800, 2.5/12800, 0.0123])
+@pytest.mark.parametrize('time_start, id_start', [(0, 0), (0.0003, 4)])
+def test_shift_cid_equals_argmin(time_shift_i, time_start, id_start):
+    """
+    shift_cid gives the same center ids as np.argmin per shift
+    """
+    cid_list = SignalHelper().shift_cid(signal_center, time, time_shift_i,
+                                        time_start=time_start, id_start=id_start)
+    assert cid_list == shift_cid_loop(time, time_shift_i, time_start=time_start, id_start=id_start)
+
+
+def test_nearest_ids_equal_argmin():
+    """
+    get_nearest_ids equals np.argmin (lower id on equal distance)
+    """
+    values = np.concatenate([np.linspace(-0.01, 0.06, 1001), (time[:-1] + time[1:]) / 2])
+    nearest = SignalHelper().get_nearest_ids(time, values)
+    np.testing.assert_array_equal(nearest, [np.argmin(np.abs(time - value)) for value in values])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# import built in libarys
+import os
+import json
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys
+from gearbox.snapshot import save_object, load_object, manifest_name, snapshot_version
+
+
+def write_manifest(path, obj):
+    """
+    Method to write a snapshot manifest of the given encoded object
+    """
+    os.makedirs(path)
+    with open(os.path.join(path, manifest_name), 'w') as file:
+        json.dump({'snapshot_version': snapshot_version, 'object': obj}, file)
+
+
+@pytest.mark.parametrize('module, cls', [('subprocess', 'Popen'),
+                                         ('gearbox', 'os.system'),
+                                         ('gearbox', 'np.ndarray'),
+                                         ('gearboxes', 'Gearbox')])
+def test_load_rejects_other_classes(tmp_path, module, cls):
+    """
+    A manifest can only create objects of gearbox classes
+    """
+    path = str(tmp_path / 'snapshot')
+    write_manifest(path, {'__type__': 'object', 'module': module, 'class': cls, 'state': {}, '__id__': 0})
+    with pytest.raises(TypeError):
+        load_object(path)
+
+
+def test_load_rejects_unknown_types(tmp_path):
+    """
+    A manifest entry of unknown type raises a TypeError
+    """
+    path = str(tmp_path / 'snapshot')
+    write_manifest(path, {'__type__': 'pickle', 'data': '', '__id__': 0})
+    with pytest.raises(TypeError):
+        load_object(path)
+
+
+def test_save_rejects_other_classes(tmp_path):
+    """
+    Objects of other classes can not be saved
+    """
+    class Other():
+        pass
+    with pytest.raises(TypeError):
+        save_object({'other': Other()}, str(tmp_path / 'snapshot'))
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_save_replaces_snapshot(tmp_path, monkeypatch):
+    """
+    An existing snapshot is replaced and kept if the new one can not
+    be moved into place
+    """
+    path = str(tmp_path / 'snapshot')
+    save_object({'array': np.arange(3)}, path)
+    save_object({'array': np.arange(5)}, path)
+    np.testing.assert_array_equal(load_object(path)['array'], np.arange(5))
+    rename = os.rename
+    def rename_failing(source, target):
+        if '.tmp-' in source:
+            raise OSError('rename failed')
+        rename(source, target)
+    monkeypatch.setattr(os, 'rename', rename_failing)
+    with pytest.raises(OSError):
+        save_object({'array': np.arange(7)}, path)
+    np.testing.assert_array_equal(load_object(path)['array'], np.arange(5))
+    assert os.listdir(str(tmp_path)) == ['snapshot']
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+import pytest
+
+# import local libarys (GearboxParams is added to the path by conftest)
+from GearboxParams import Deg_GearIn
+
+# Several pitted teeth at the tested nolcs
+Deg_GearIn_4 = dict(Deg_GearIn, Failing_Teeth=4)
+
+
+@pytest.mark.parametrize('fixed_start', [True, False])
+def test_lean_equals_element_signals(make_model, torque, fixed_start):
+    """
+    Lean run_vibration gives the sum of the element signals of the
+    non-lean mode
+    """
+    model = make_model(fixed_start=fixed_start, Deg_GearIn=Deg_GearIn_4)
+    model.initialize(torque)
+    for nolc in [1e6, 6e6, 9e6]:
+        statei = model.state_at(nolc)
+        vibration = model.Vibration.run_vibration(nolc, torque, statei=statei, lean=True).copy()
+        assert not model.Vibration.signals_kept
+        vibration_full = model.Vibration.run_vibration(nolc, torque, statei=statei, lean=False)
+        assert model.Vibration.signals_kept
+        np.testing.assert_allclose(vibration, vibration_full, rtol=0, atol=1e-12)
+    assert model.Vibration.degr_gin.shape[1] == 4
+
+
+
+@pytest.mark.parametrize('fixed_start', [True, False])
+def test_run_out_equals_run(make_model, torque, fixed_start, tmp_path):
+    """
+    run(nolc, out=row) writes the same vibration as run(nolc) into
+    the given row and keeps no reference to it
+    """
+    model = make_model(fixed_start=fixed_start)
+    model.initialize(torque)
+    model_out = make_model(fixed_start=fixed_start)
+    model_out.initialize(torque)
+    nolcs = [1e6, 8e6, 12e6]
+    no_samples = model.Vibration.real_sample_time.shape[0]
+    vibrations = np.lib.format.open_memmap(str(tmp_path / 'vibrations.npy'), mode='w+', shape=(len(nolcs), no_samples))
+    for idx, nolc in enumerate(nolcs):
+        vibration = model.run(nolc)
+        row = vibrations[idx]
+        assert model_out.run(nolc, out=row) is row
+        assert (model_out.ga_vibration is None) and (model_out.Vibration.signal_raw is None)
+        np.testing.assert_array_equal(row, vibration.reshape(-1))
+
+
+def test_run_out_rejects_buffers(make_model, torque):
+    """
+    Buffers of other size, dtype or layout are rejected
+    """
+    model = make_model()
+    model.initialize(torque)
+    no_samples = model.Vibration.real_sample_time.shape[0]
+    for out in [np.empty(no_samples + 1), np.empty(no_samples, dtype=np.float32), np.empty((no_samples, 2))[:, 0]]:
+        with pytest.raises(AssertionError):
+            model.run(1e6, out=out)
+
+
+def test_summed_degradation_equals_tooth_columns(make_model, torque):
+    """
+    The summed degradation signal (one bincount) equals the sum of
+    the per tooth columns
+    """
+    model = make_model()
+    model.initialize(torque)
+    gear = model.Vibration.GearIn
+    teeth = np.array([1, 4, 8, 12, 21])
+    amplitudes = np.linspace(0.5, 3.0, teeth.size)
+    for window in [None, (100, 2000)]:
+        signal = gear.get_teeth_degr_signal(teeth, amplitudes=amplitudes, window=window)
+        assert (signal.shape[1] == teeth.size) and np.all(np.count_nonzero(signal, axis=0) > 0)
+        np.testing.assert_allclose(gear.get_teeth_degr_signal(teeth, amplitudes=amplitudes, window=window, summed=True),
+                                   np.sum(signal, axis=1, keepdims=True), rtol=1e-12)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+# import 3rd party libarys
+import numpy as np
+
+# import local libarys (GearboxParams is added to the path by conftest)
+from GearboxParams import GearIn, GearOut, GearDegVibDictIn, GearDegVibDictOut
+
+# Elements without random noise (deterministic part of the vibration)
+noiseless = {'GearIn': dict(GearIn, noise_method=None),
+             'GearOut': dict(GearOut, noise_method=None),
+             'GearDegVibDictIn': dict(GearDegVibDictIn, noise_method=None),
+             'GearDegVibDictOut': dict(GearDegVibDictOut, noise_method=None)}
+
+
+def test_window_equals_full_synthesis(make_model, torque):
+    """
+    Synthesizing only the random window gives the same vibration as
+    synthesizing the full period and trimming it to the window
+    """
+    models = {}
+    for window_synthesis in [True, False]:
+        models[window_synthesis] = make_model(fixed_start=False, window_synthesis=window_synthesis, **noiseless)
+        models[window_synthesis].initialize(torque)
+    assert models[True].Vibration.synthesize_window and not models[False].Vibration.synthesize_window
+    for nolc in [1e6, 8e6, 12e6]:
+        vibration = models[False].run(nolc)
+        np.testing.assert_allclose(models[True].run(nolc), vibration, rtol=0, atol=1e-12)
+        assert models[True].Vibration.start_id == models[False].Vibration.start_id
+        for model in models.values():
+            model.set(nolc, torque * 1.2)